@@ -1,9 +1,29 @@
+import logging
+import os
+
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import numpy as np
 from scipy.stats import pearsonr
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from data_export import (EXPORT_DIR, EXPORT_FORMATS, EXPORT_URL_PATH, MAX_SERVED_BYTES, start_export_cleanup,
+                         write_export)
+from dataset import build_filter_mask, load_dataset
+from metrics import (StratifiedSampler, exact_summary, explicit_comparison_frame, platform_totals_frame,
+                     top_ranked)
+from figures import (cached_figure, explicit_comparison_figure, platform_mix_figure, platform_share_figure,
+                     playlist_influence_figure, rank_trends_figure, release_trend_figure, slider_histogram_figure)
+from filter_counts import RangeCounts
+from rollups import RESOLUTIONS, ReleaseRollups
+from similarity import SimilarityIndex
+from track_browser import SortIndex
+
+# Log each figure's spec size and whether it was built or reused on every rerun
+figure_logger = logging.getLogger('figures')
+if not figure_logger.handlers:
+    figure_logger.addHandler(logging.StreamHandler())
+    figure_logger.setLevel(logging.INFO)
 
 # Page configuration
 st.set_page_config(
@@ -159,29 +179,48 @@ st.markdown("""
 # Load data with caching
 @st.cache_data
 def load_data():
-    df = pd.read_csv('Most Streamed Spotify Songs 2024_cleaned.csv', encoding='latin-1')
-
-    # Convert numeric columns
-    numeric_cols = ['All Time Rank', 'Spotify Streams', 'Spotify Playlist Count', 'Spotify Playlist Reach',
-                    'Spotify Popularity', 'YouTube Views', 'YouTube Likes', 'TikTok Posts',
-                    'TikTok Likes', 'TikTok Views', 'YouTube Playlist Reach',
-                    'Apple Music Playlist Count', 'AirPlay Spins',
-                    'Deezer Playlist Count', 'Deezer Playlist Reach', 'Amazon Playlist Count',
-                    'Pandora Streams', 'Shazam Counts', 'Track Score']
-
-    for col in numeric_cols:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-
-    # Extract release year if Release Date exists
-    if 'Release Date' in df.columns:
-        df['Release Year'] = pd.to_datetime(df['Release Date'], errors='coerce').dt.year
-
-    # Ensure Explicit column exists
-    if 'Explicit Track' in df.columns:
-        df['Track Type'] = df['Explicit Track'].apply(lambda x: 'Explicit' if x == True or str(x).lower() == 'true' else 'Clean')
-
-    return df
+    return load_dataset()
+
+# Sort orders for the track browser, built once per dataset and shared by all sessions
+@st.cache_resource
+def load_sort_index():
+    data = load_data()
+    sortable_columns = [col for col in data.select_dtypes(include=np.number).columns
+                        if col != 'Explicit Track']
+    return SortIndex(data, sortable_columns)
+
+# Release-date rollups at every resolution, built once per dataset
+@st.cache_resource
+def load_release_rollups():
+    return ReleaseRollups(load_data())
+
+# Engagement-profile KD-tree for "tracks like this", built once per dataset
+@st.cache_resource
+def load_similarity_index():
+    return SimilarityIndex(load_data())
+
+# Cumulative year x score counts per Track Type for the sidebar previews, built once per dataset
+@st.cache_resource
+def load_range_counts():
+    return RangeCounts(load_data())
+
+# Fast mode: permutation-based stratified sampler, built once per dataset
+@st.cache_resource
+def load_sampler():
+    return StratifiedSampler(load_data(), strata_columns=('Track Type', 'Release Year'))
+
+# Background workers that refine fast-mode estimates to exact values
+@st.cache_resource
+def exact_summary_executor():
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix='exact-summary')
+
+# Background sweep deleting expired export files, started once per server
+@st.cache_resource
+def export_cleanup():
+    return start_export_cleanup()
+
+# Fraction of each Track Type x Release Year stratum sampled in fast mode
+FAST_MODE_FRACTION = 0.02
 
 # Load the data
 df = load_data()
@@ -209,6 +248,7 @@ else:
 if 'Release Year' in df.columns:
     year_min = int(df['Release Year'].min()) if not df['Release Year'].isna().all() else 2000
     year_max = int(df['Release Year'].max()) if not df['Release Year'].isna().all() else 2024
+    year_histogram_slot = st.sidebar.empty()
     year_range = st.sidebar.slider(
         "Release Year Range",
         min_value=year_min,
@@ -223,6 +263,7 @@ else:
 if 'Track Score' in df.columns:
     score_min = float(df['Track Score'].min()) if not df['Track Score'].isna().all() else 0.0
     score_max = float(df['Track Score'].max()) if not df['Track Score'].isna().all() else 100.0
+    score_histogram_slot = st.sidebar.empty()
     score_range = st.sidebar.slider(
         "Track Score Range",
         min_value=score_min,
@@ -233,148 +274,134 @@ if 'Track Score' in df.columns:
 else:
     score_range = None
 
-# Apply filters
-df_filtered = df.copy()
+# Slider previews and live count from the precomputed cumulative counts (no pass over the rows). The
+# previews are cheap to build and change with every slider move, so they skip cached_figure rather than
+# evict the main charts. Counts fall back to the filter mask when the score axis had to be binned
+num_matching = None
+if {'Track Type', 'Release Year', 'Track Score'} <= set(df.columns):
+    range_counts = load_range_counts()
+    if range_counts.exact_counts:
+        num_matching = range_counts.count(track_types, year_range, score_range)
+
+    year_histogram = range_counts.year_histogram(track_types, score_range).to_frame()
+    year_histogram['In Range'] = ((year_histogram.index >= year_range[0]) &
+                                  (year_histogram.index <= year_range[1]))
+    year_histogram_slot.plotly_chart(
+        slider_histogram_figure(year_histogram),
+        use_container_width=True, config={'displayModeBar': False}
+    )
 
-if track_types and 'Track Type' in df.columns:
-    df_filtered = df_filtered[df_filtered['Track Type'].isin(track_types)]
+    score_histogram = range_counts.score_histogram(track_types, year_range).to_frame()
+    score_histogram['In Range'] = ((score_histogram.index >= score_range[0]) &
+                                   (score_histogram.index <= score_range[1]))
+    score_histogram_slot.plotly_chart(
+        slider_histogram_figure(score_histogram),
+        use_container_width=True, config={'displayModeBar': False}
+    )
+
+# Apply filters as a boolean mask over the full dataset
+filter_mask = build_filter_mask(df, track_types, year_range, score_range)
+if num_matching is None:
+    num_matching = int(filter_mask.sum())
 
-if year_range and 'Release Year' in df.columns:
-    df_filtered = df_filtered[(df_filtered['Release Year'] >= year_range[0]) &
-                              (df_filtered['Release Year'] <= year_range[1])]
+st.sidebar.markdown("---")
+st.sidebar.markdown(f"**Showing {num_matching} of {len(df)} tracks**")
 
-if score_range and 'Track Score' in df.columns:
-    df_filtered = df_filtered[(df_filtered['Track Score'] >= score_range[0]) &
-                              (df_filtered['Track Score'] <= score_range[1])]
+df_filtered = df[filter_mask]
+filter_key = (tuple(track_types or ()), tuple(year_range or ()), tuple(score_range or ()))
 
+# Fast mode: show sampled estimates first, refine to exact values in the background
 st.sidebar.markdown("---")
-st.sidebar.markdown(f"**Showing {len(df_filtered)} of {len(df)} tracks**")
+fast_mode = st.sidebar.toggle(
+    "Fast Mode (approximate)",
+    value=False,
+    help="Estimate key metrics, platform shares and explicit vs clean averages from a stratified "
+         "sample first, then refine them to exact values in the background"
+)
+
+@st.fragment(run_every=0.5)
+def refresh_when_exact(job):
+    if job.done():
+        st.rerun()
+    st.caption("Refining estimates to exact values...")
+
+# Nothing to summarize or chart: stop before any of the heavy sections run
+if num_matching == 0:
+    st.warning("No tracks match the current filters. Widen the Release Year or Track Score range, "
+               "or select another Track Type.")
+    st.stop()
+
+if fast_mode:
+    exact_job = st.session_state.get('exact_summary_job')
+    if exact_job is None or exact_job[0] != filter_key:
+        if exact_job is not None:
+            # Drop the superseded pass if it has not started, so it doesn't hold up other viewers
+            exact_job[1].cancel()
+        exact_job = (filter_key, exact_summary_executor().submit(exact_summary, df, filter_mask))
+        st.session_state['exact_summary_job'] = exact_job
+
+    summary = None
+    if exact_job[1].done():
+        try:
+            summary = exact_job[1].result()
+        except Exception:
+            st.sidebar.caption("Exact values could not be computed; showing estimates.")
+
+    if summary is None:
+        summary = load_sampler().summary(df, filter_mask, FAST_MODE_FRACTION)
+        if not exact_job[1].done():
+            with st.sidebar:
+                refresh_when_exact(exact_job[1])
+else:
+    summary = exact_summary(df, filter_mask)
+
+
+def show_margin(estimate, formatter):
+    """Caption a fast-mode estimate with its 95% confidence margin."""
+    if estimate.margin is not None:
+        st.caption(f"± {formatter(estimate.margin)} (95% CI)")
 
 # Key Metrics
 st.markdown("## Key Metrics")
 col1, col2, col3, col4, col5 = st.columns(5)
 
+if not summary['exact']:
+    st.info(f"Fast mode: estimates from a stratified sample of {summary['sample_size']:,} of "
+            f"{summary['total_songs']:,} tracks, shown with 95% confidence intervals.")
+
 with col1:
-    st.metric("Total Songs", f"{len(df_filtered):,}")
+    st.metric("Total Songs", f"{summary['total_songs']:,}")
 
 with col2:
-    avg_streams = df_filtered['Spotify Streams'].mean() if 'Spotify Streams' in df_filtered.columns else 0
-    st.metric("Avg Streams", f"{avg_streams/1e6:.1f}M")
+    avg_streams = summary['avg_streams']
+    st.metric("Avg Streams", f"{avg_streams.value/1e6:.1f}M")
+    show_margin(avg_streams, lambda m: f"{m/1e6:.1f}M")
 
 with col3:
-    if 'Track Type' in df_filtered.columns:
-        explicit_pct = (df_filtered['Track Type'] == 'Explicit').sum() / len(df_filtered) * 100
-        st.metric("% Explicit", f"{explicit_pct:.1f}%")
-    else:
-        st.metric("% Explicit", "N/A")
+    explicit_pct = summary['explicit_pct']
+    st.metric("% Explicit", f"{explicit_pct.value:.1f}%")
+    show_margin(explicit_pct, lambda m: f"{m:.1f}%")
 
 with col4:
-    avg_score = df_filtered['Track Score'].mean() if 'Track Score' in df_filtered.columns else 0
-    st.metric("Avg Score", f"{avg_score:.1f}")
+    avg_score = summary['avg_score']
+    st.metric("Avg Score", f"{avg_score.value:.1f}")
+    show_margin(avg_score, lambda m: f"{m:.1f}")
 
 with col5:
-    if 'Artist' in df_filtered.columns:
-        top_artist = df_filtered['Artist'].value_counts().index[0] if len(df_filtered) > 0 else "N/A"
-        st.metric("Top Artist", top_artist[:15])
-    else:
-        st.metric("Top Artist", "N/A")
+    top_artist = summary['top_artist'] or "N/A"
+    st.metric("Top Artist", top_artist[:15])
 
 st.markdown("---")
 
 # Research Question 1: YouTube and TikTok vs Spotify
 st.markdown("<h2>1. Does YouTube and TikTok Popularity Predict Spotify Success?</h2>", unsafe_allow_html=True)
 
-# Get top 15 songs by All Time Rank (lower rank = better) and prepare data
-top15_q1 = df_filtered.nsmallest(15, 'All Time Rank')[['Track', 'Artist', 'All Time Rank', 'Spotify Streams', 'YouTube Views', 'TikTok Views']].copy()
+# Top 15 songs by All Time Rank (lower rank = better), in rank order
+top15_q1 = top_ranked(df_filtered, ['Spotify Streams', 'YouTube Views', 'TikTok Views'],
+                      fill_columns=['YouTube Views', 'TikTok Views'])
 
 if len(top15_q1) > 0:
-    # Fill missing values with 0 for visualization
-    top15_q1['YouTube Views'] = top15_q1['YouTube Views'].fillna(0)
-    top15_q1['TikTok Views'] = top15_q1['TikTok Views'].fillna(0)
-
-    # Sort by rank to show progression from rank 1 to 15
-    top15_q1 = top15_q1.sort_values('All Time Rank')
-
-    # Normalize the data to billions for better readability
-    top15_q1['Spotify Streams (B)'] = top15_q1['Spotify Streams'] / 1e9
-    top15_q1['YouTube Views (B)'] = top15_q1['YouTube Views'] / 1e9
-    top15_q1['TikTok Views (B)'] = top15_q1['TikTok Views'] / 1e9
-
-    # Create line chart with 3 trend lines
-    fig1 = go.Figure()
-
-    # Add Spotify Streams line
-    fig1.add_trace(go.Scatter(
-        x=top15_q1['All Time Rank'],
-        y=top15_q1['Spotify Streams (B)'],
-        mode='lines+markers',
-        name='Spotify Streams',
-        line=dict(color='#1DB954', width=3),
-        marker=dict(size=8)
-    ))
-
-    # Add YouTube Views line
-    fig1.add_trace(go.Scatter(
-        x=top15_q1['All Time Rank'],
-        y=top15_q1['YouTube Views (B)'],
-        mode='lines+markers',
-        name='YouTube Views',
-        line=dict(color='#0066CC', width=3),
-        marker=dict(size=8)
-    ))
-
-    # Add TikTok Views line
-    fig1.add_trace(go.Scatter(
-        x=top15_q1['All Time Rank'],
-        y=top15_q1['TikTok Views (B)'],
-        mode='lines+markers',
-        name='TikTok Views',
-        line=dict(color='#FF6B9D', width=3),
-        marker=dict(size=8)
-    ))
-
-    fig1.update_layout(
-        title={
-            'text': '<b>Top 15 Songs by Rank: Do YouTube & TikTok Trends Follow Spotify Success?</b>',
-            'x': 0.5,
-            'xanchor': 'center',
-            'font': {'size': 20}
-        },
-        xaxis_title='<b>All Time Rank (Lower = Better)</b>',
-        yaxis_title='<b>Engagement (Billions)</b>',
-        height=600,
-        hovermode='x unified',
-        plot_bgcolor='white',
-        paper_bgcolor='white',
-        font=dict(color='black', size=14),
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1,
-            font=dict(size=14, color='black')
-        ),
-        xaxis=dict(
-            tickmode='linear',
-            tick0=1,
-            dtick=1,
-            showgrid=False,
-            linecolor='black',
-            linewidth=2,
-            title_font=dict(color='black', size=16),
-            tickfont=dict(size=14, color='black')
-        ),
-        yaxis=dict(
-            showgrid=False,
-            linecolor='black',
-            linewidth=2,
-            title_font=dict(color='black', size=16),
-            tickfont=dict(size=14, color='black'),
-            ticksuffix='B'
-        )
-    )
-
+    fig1 = cached_figure('fig1_rank_trends', rank_trends_figure, top15_q1)
     st.plotly_chart(fig1, use_container_width=True)
 
     # Show song reference table
@@ -400,62 +427,18 @@ st.markdown("---")
 # Research Question 2: Platform Engagement
 st.markdown("<h2>2. Which Streaming Platform Drives the Most Engagement?</h2>", unsafe_allow_html=True)
 
-# Calculate total engagement per platform
-platform_totals = pd.DataFrame({
-    'Platform': ['Spotify', 'YouTube', 'TikTok'],
-    'Total Engagement': [
-        df_filtered['Spotify Streams'].sum(),
-        df_filtered['YouTube Views'].sum(),
-        df_filtered['TikTok Views'].sum()
-    ]
-})
+# Total engagement per platform
+platform_totals = platform_totals_frame(summary)
 
 if platform_totals['Total Engagement'].sum() > 0:
-    fig5 = px.pie(
-        platform_totals,
-        values='Total Engagement',
-        names='Platform',
-        title='<b>Market Share of Total Engagement Across Platforms</b>',
-        color='Platform',
-        color_discrete_map={
-            'Spotify': '#1DB954',
-            'YouTube': '#0066CC',
-            'TikTok': '#FF6B9D'
-        },
-        hole=0.4
-    )
-
-    fig5.update_traces(
-        textposition='inside',
-        textinfo='percent+label',
-        hovertemplate='<b>%{label}</b><br>Engagement: %{value:,.0f}<br>Share: %{percent}',
-        textfont=dict(size=16, color='white')
-    )
-
-    fig5.update_layout(
-        height=500,
-        title={
-            'x': 0.5,
-            'xanchor': 'center',
-            'font': {'size': 20}
-        },
-        plot_bgcolor='white',
-        paper_bgcolor='white',
-        font=dict(color='black', size=16),
-        legend=dict(
-            x=0.5,
-            y=0.5,
-            xanchor='center',
-            yanchor='middle',
-            bgcolor='rgba(255,255,255,0.8)',
-            bordercolor='black',
-            borderwidth=1,
-            font=dict(size=16, color='black')
-        ),
-        showlegend=True
-    )
-
+    fig5 = cached_figure('fig5_platform_share', platform_share_figure, platform_totals)
     st.plotly_chart(fig5, use_container_width=True)
+
+    if not summary['exact']:
+        st.caption("Estimated shares (95% CI): " + ", ".join(
+            f"{platform} {share.value:.1%} ± {share.margin:.1%}"
+            for platform, share in summary['platform_shares'].items()
+        ))
 else:
     st.warning("No data available for this visualization after filtering.")
 
@@ -464,105 +447,12 @@ st.markdown("---")
 # Research Question 3: Playlist Count Impact
 st.markdown("<h2>3. Does Spotify Playlist Count Influence Spotify Streams?</h2>", unsafe_allow_html=True)
 
-# Get top 15 songs by All Time Rank and prepare data
-# Filter out rows with missing All Time Rank first
-df_q3_filtered = df_filtered.dropna(subset=['All Time Rank'])
-top15_q3 = df_q3_filtered.nsmallest(15, 'All Time Rank')[['Track', 'Artist', 'All Time Rank', 'Spotify Streams', 'Spotify Playlist Count']].copy()
+# Top 15 songs by All Time Rank, in rank order
+top15_q3 = top_ranked(df_filtered, ['Spotify Streams', 'Spotify Playlist Count'],
+                      fill_columns=['Spotify Playlist Count', 'Spotify Streams'])
 
 if len(top15_q3) > 0:
-    # Fill missing values with 0 for visualization
-    top15_q3['Spotify Playlist Count'] = top15_q3['Spotify Playlist Count'].fillna(0)
-    top15_q3['Spotify Streams'] = top15_q3['Spotify Streams'].fillna(0)
-
-    # Sort by rank to show progression from rank 1 to 15
-    top15_q3 = top15_q3.sort_values('All Time Rank')
-
-    # Normalize the data for better visualization
-    top15_q3['Spotify Streams (B)'] = top15_q3['Spotify Streams'] / 1e9
-    top15_q3['Playlist Count'] = top15_q3['Spotify Playlist Count']
-
-    # Create line chart with 2 trend lines
-    fig6 = go.Figure()
-
-    # Add Spotify Streams line
-    fig6.add_trace(go.Scatter(
-        x=top15_q3['All Time Rank'],
-        y=top15_q3['Spotify Streams (B)'],
-        mode='lines+markers',
-        name='Spotify Streams (Billions)',
-        line=dict(color='#1DB954', width=3),
-        marker=dict(size=8),
-        yaxis='y'
-    ))
-
-    # Add Spotify Playlist Count line (on secondary y-axis)
-    fig6.add_trace(go.Scatter(
-        x=top15_q3['All Time Rank'],
-        y=top15_q3['Playlist Count'],
-        mode='lines+markers',
-        name='Playlist Count',
-        line=dict(color='#A855F7', width=3),
-        marker=dict(size=8),
-        yaxis='y2'
-    ))
-
-    fig6.update_layout(
-        title={
-            'text': '<b>Top 15 Songs by Rank: Does Playlist Count Influence Streams?</b>',
-            'x': 0.5,
-            'xanchor': 'center',
-            'font': {'size': 20}
-        },
-        paper_bgcolor='white',
-        plot_bgcolor='white',
-        font=dict(color='black', size=14),
-        xaxis_title='<b>All Time Rank (Lower = Better)</b>',
-        yaxis=dict(
-            title=dict(
-                text='<b>Spotify Streams (Billions)</b>',
-                font=dict(color='black', size=16)
-            ),
-            tickfont=dict(color='black', size=14),
-            showgrid=False,
-            linecolor='black',
-            linewidth=2,
-            ticksuffix='B'
-        ),
-        yaxis2=dict(
-            title=dict(
-                text='<b>Playlist Count</b>',
-                font=dict(color='black', size=16)
-            ),
-            tickfont=dict(color='black', size=14),
-            anchor='x',
-            overlaying='y',
-            side='right',
-            showgrid=False,
-            linecolor='black',
-            linewidth=2
-        ),
-        height=600,
-        hovermode='x unified',
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1,
-            font=dict(size=14, color='black')
-        ),
-        xaxis=dict(
-            tickmode='linear',
-            tick0=1,
-            dtick=1,
-            showgrid=False,
-            linecolor='black',
-            linewidth=2,
-            title_font=dict(color='black', size=16),
-            tickfont=dict(size=14, color='black')
-        )
-    )
-
+    fig6 = cached_figure('fig6_playlist_influence', playlist_influence_figure, top15_q3)
     st.plotly_chart(fig6, use_container_width=True)
 
     # Show song reference table
@@ -591,90 +481,198 @@ st.markdown("<h2>4. Do Explicit Songs Perform Better or Worse Across Platforms?<
 
 if 'Track Type' in df_filtered.columns:
 
-    # Calculate averages by track type
-    platform_comparison = df_filtered.groupby('Track Type')[['Spotify Streams', 'YouTube Views', 'TikTok Views']].mean().reset_index()
+    # Averages by track type
+    platform_comparison = explicit_comparison_frame(summary)
 
     if len(platform_comparison) > 0:
-        comparison_melted = platform_comparison.melt(
-            id_vars=['Track Type'],
-            value_vars=['Spotify Streams', 'YouTube Views', 'TikTok Views'],
-            var_name='Platform',
-            value_name='Average Engagement'
-        )
-
-        # Custom formatting function for M (million) and B (billion)
-        def format_engagement(num):
-            if num >= 1e9:
-                return f'{num/1e9:.1f}B'
-            elif num >= 1e6:
-                return f'{num/1e6:.1f}M'
-            else:
-                return f'{num:.0f}'
-
-        comparison_melted['Formatted Text'] = comparison_melted['Average Engagement'].apply(format_engagement)
-
-        fig9 = px.bar(
-            comparison_melted,
-            x='Platform',
-            y='Average Engagement',
-            color='Track Type',
-            barmode='group',
-            title='<b>Explicit vs Clean Songs: Average Performance by Platform</b>',
-            labels={'Average Engagement': '<b>Average Engagement</b>', 'Platform': '<b>Platform</b>'},
-            color_discrete_map={
-                'Explicit': '#FF6B6B',
-                'Clean': '#1DB954'
-            },
-            text='Formatted Text'
-        )
-
-        fig9.update_traces(
-            texttemplate='%{text}',
-            textposition='outside',
-            textfont=dict(size=16, color='black')
-        )
-        fig9.update_layout(
-            height=500,
-            title={
-                'x': 0.5,
-                'xanchor': 'center',
-                'font': {'size': 20}
-            },
-            paper_bgcolor='white',
-            plot_bgcolor='white',
-            font=dict(color='black', size=14),
-            xaxis=dict(
-                showgrid=False,
-                linecolor='black',
-                linewidth=2,
-                title_font=dict(color='black', size=16),
-                tickfont=dict(size=16, color='black')
-            ),
-            yaxis=dict(
-                showgrid=False,
-                linecolor='black',
-                linewidth=2,
-                title_font=dict(color='black', size=16),
-                tickfont=dict(size=14, color='black')
-            ),
-            xaxis_title='<b>Platform</b>',
-            yaxis_title='<b>Average Engagement</b>',
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1,
-                font=dict(size=14, color='black')
-            )
-        )
-
+        fig9 = cached_figure('fig9_explicit_comparison', explicit_comparison_figure, platform_comparison)
         st.plotly_chart(fig9, use_container_width=True)
+
+        if not summary['exact']:
+            for track_type, means in summary['explicit_means'].items():
+                st.caption(f"{track_type} averages (95% CI): " + ", ".join(
+                    f"{column} {estimate.value/1e6:,.1f}M ± {estimate.margin/1e6:,.1f}M"
+                    for column, estimate in means.items()
+                ))
     else:
         st.warning("No data available for this visualization after filtering.")
 else:
     st.warning("Track Type information not available in the dataset.")
 
+st.markdown("---")
+
+# Release Trends: served from precomputed rollups, no row scans
+st.markdown("<h2>Release Trends</h2>", unsafe_allow_html=True)
+
+resolution = st.radio("Resolution", options=list(RESOLUTIONS), index=2, horizontal=True)
+release_rollup = load_release_rollups().query(
+    resolution,
+    track_types=track_types,
+    score_range=score_range,
+    year_range=year_range
+)
+
+if release_rollup['Tracks'].sum() > 0:
+    fig_trends = cached_figure(f'release_trends_{resolution.lower()}',
+                               partial(release_trend_figure, resolution=resolution), release_rollup)
+    st.plotly_chart(fig_trends, use_container_width=True)
+
+    fig_mix = cached_figure(f'platform_mix_{resolution.lower()}',
+                            partial(platform_mix_figure, resolution=resolution), release_rollup)
+    st.plotly_chart(fig_mix, use_container_width=True)
+else:
+    st.warning("No data available for this visualization after filtering.")
+
+st.markdown("---")
+
+# Track Browser: sorted and paged server-side, only the visible page is sent
+st.markdown("<h2>Track Browser</h2>", unsafe_allow_html=True)
+
+sort_index = load_sort_index()
+
+col1, col2, col3, col4 = st.columns(4)
+
+with col1:
+    sort_column = st.selectbox(
+        "Sort By",
+        options=sort_index.columns,
+        index=sort_index.columns.index('All Time Rank') if 'All Time Rank' in sort_index.columns else 0
+    )
+with col2:
+    sort_order = st.selectbox("Order", options=['Ascending', 'Descending'])
+with col3:
+    page_size = st.selectbox("Rows per Page", options=[25, 50, 100], index=0)
+
+num_pages = max(1, -(-num_matching // page_size))
+
+with col4:
+    page_number = st.number_input("Page", min_value=1, max_value=num_pages, value=1, step=1)
+
+page_positions, num_matches = sort_index.page(
+    sort_column,
+    int(page_number) - 1,
+    page_size,
+    descending=sort_order == 'Descending',
+    mask=filter_mask
+)
+
+if num_matches > 0:
+    browser_columns = ['All Time Rank', 'Track', 'Artist', 'Album Name', 'Release Date', 'Track Score',
+                       'Spotify Streams', 'YouTube Views', 'TikTok Views']
+    browser_columns = [col for col in browser_columns if col in df.columns]
+    if sort_column not in browser_columns:
+        browser_columns.append(sort_column)
+
+    st.dataframe(df.iloc[page_positions][browser_columns], hide_index=True, use_container_width=True)
+
+    page_start = (int(page_number) - 1) * page_size
+    st.caption(f"Rows {page_start + 1:,}-{page_start + len(page_positions):,} of {num_matches:,} "
+               f"(page {int(page_number)} of {num_pages})")
+else:
+    st.warning("No data available for this visualization after filtering.")
+
+st.markdown("---")
+
+# Tracks Like This: nearest neighbours by cross-platform engagement profile
+st.markdown("<h2>Tracks Like This</h2>", unsafe_allow_html=True)
+
+similarity_index = load_similarity_index()
+
+col1, col2, col3 = st.columns([2, 3, 1])
+
+with col1:
+    track_search = st.text_input("Search Track", help="Filter the track list by title")
+
+candidate_mask = filter_mask
+if track_search:
+    candidate_mask = filter_mask.copy()
+    candidate_mask[filter_mask] = df_filtered['Track'].str.contains(
+        track_search, case=False, regex=False, na=False
+    ).to_numpy()
+# Keep the picker small: the best-ranked matches first, read off the precomputed rank order
+track_candidates = sort_index.first('All Time Rank', 200, mask=candidate_mask)
+
+with col2:
+    selected_track = st.selectbox(
+        "Track",
+        options=track_candidates.tolist(),
+        format_func=lambda pos: f"{df['Track'].iat[pos]} - {df['Artist'].iat[pos]}",
+        help="Pick a track to find others with a similar engagement profile"
+    )
+with col3:
+    num_neighbors = st.number_input("K", min_value=1, max_value=50, value=10, step=1)
+
+if selected_track is not None:
+    neighbor_positions, neighbor_distances = similarity_index.query(
+        selected_track, k=int(num_neighbors), mask=filter_mask
+    )
+    similar_tracks = df.iloc[neighbor_positions][['Track', 'Artist', *similarity_index.columns[:4]]].copy()
+    similar_tracks.insert(2, 'Distance', np.round(neighbor_distances, 3))
+    st.dataframe(similar_tracks, hide_index=True, use_container_width=True)
+    st.caption("Distance between log-scaled, standardized profiles of "
+               + ", ".join(similarity_index.columns) + ". Lower is more similar.")
+else:
+    st.warning("No data available for this visualization after filtering.")
+
+st.markdown("---")
+
+# Download the rows behind the current filters
+st.markdown("<h2>Download Filtered Tracks</h2>", unsafe_allow_html=True)
+
+col1, col2, col3 = st.columns(3)
+
+with col1:
+    export_columns = st.multiselect(
+        "Columns",
+        options=list(df.columns),
+        default=list(df.columns),
+        help="Columns to include in the download"
+    )
+with col2:
+    export_format = st.selectbox("Format", options=list(EXPORT_FORMATS))
+with col3:
+    export_max_rows = st.number_input(
+        "Max Rows (0 = all)",
+        min_value=0,
+        value=0,
+        step=1000,
+        help="Cap the number of exported rows"
+    )
+
+export_extension, _ = EXPORT_FORMATS[export_format]
+export_rows = num_matching
+if export_max_rows:
+    export_rows = min(export_rows, int(export_max_rows))
+
+# The file is written to disk one chunk at a time and streamed to the browser by Streamlit's
+# static file route, so neither step holds the whole export in memory
+export_cleanup()
+export_request = (filter_key, export_format, tuple(export_columns), int(export_max_rows))
+if st.button(f"Prepare {export_rows:,} Tracks as {export_format}",
+             disabled=not export_columns or export_rows == 0):
+    with st.spinner("Writing export..."):
+        st.session_state['export_file'] = (
+            export_request,
+            write_export(df, export_format, mask=filter_mask, columns=export_columns,
+                         max_rows=int(export_max_rows) or None)
+        )
+
+export_file = st.session_state.get('export_file')
+if export_file is not None and export_file[0] == export_request:
+    export_path = os.path.join(EXPORT_DIR, export_file[1])
+    if not os.path.exists(export_path):
+        st.info("This export has expired. Prepare it again to download.")
+    elif os.path.getsize(export_path) > MAX_SERVED_BYTES:
+        st.warning(f"The export is larger than {MAX_SERVED_BYTES // 1024**2} MB and cannot be served. "
+                   "Use CSV (gzip) or Parquet, fewer columns or a row cap.")
+    else:
+        st.markdown(
+            f'<a href="{EXPORT_URL_PATH}/{export_file[1]}" download="spotify_tracks_filtered.{export_extension}">'
+            f'Download {export_rows:,} Tracks as {export_format} '
+            f'({os.path.getsize(export_path) / 1024**2:,.1f} MB)</a>',
+            unsafe_allow_html=True
+        )
+
 # Footer
 st.markdown("---")
 st.markdown("""
@@ -0,0 +1,188 @@
+"""Chunked export of dashboard rows as CSV, gzip CSV or Parquet.
+
+Every exporter is a generator that yields the serialized file piece by
+piece, so serialization only ever holds one chunk of rows at a time.
+``write_export`` writes the pieces straight to a randomly named file under
+the app's ``static/`` folder. Streamlit's static file route
+(``server.enableStaticServing``) then streams that file to the browser
+from disk, so the export is never held in memory as a whole. Expired
+files are removed by ``start_export_cleanup``.
+"""
+import contextlib
+import os
+import secrets
+import threading
+import time
+import zlib
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Rows serialized per chunk
+CHUNK_ROWS = 50_000
+
+# Exports live in the app's static folder, served at EXPORT_URL_PATH
+EXPORT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'exports')
+EXPORT_URL_PATH = 'app/static/exports'
+
+# Exports are deleted this long after they were written
+EXPORT_MAX_AGE_SECONDS = 30 * 60
+CLEANUP_INTERVAL_SECONDS = 5 * 60
+
+# Streamlit's static route answers 404 for larger files
+MAX_SERVED_BYTES = 200 * 1024**2
+
+# Format label -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'CSV (gzip)': ('csv.gz', 'application/gzip'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+
+
+def _row_chunks(df, mask=None, columns=None, max_rows=None, chunk_rows=CHUNK_ROWS):
+    """Yield slices of ``df`` restricted to ``mask`` and ``columns``.
+
+    Rows are taken by position straight from ``df``, so the filtered
+    frame is never materialized as a whole.
+    """
+    positions = np.flatnonzero(mask) if mask is not None else np.arange(len(df))
+    if max_rows:
+        positions = positions[:max_rows]
+    column_idx = df.columns.get_indexer(columns) if columns else np.arange(df.shape[1])
+
+    for start in range(0, len(positions), chunk_rows):
+        yield df.iloc[positions[start:start + chunk_rows], column_idx]
+
+
+def iter_csv(df, mask=None, columns=None, max_rows=None, chunk_rows=CHUNK_ROWS):
+    """Yield the selected rows as UTF-8 CSV bytes, one chunk at a time."""
+    header = True
+    for chunk in _row_chunks(df, mask, columns, max_rows, chunk_rows):
+        yield chunk.to_csv(index=False, header=header).encode('utf-8')
+        header = False
+
+    if header:
+        # No rows selected: still emit the header line
+        empty = df.iloc[:0, df.columns.get_indexer(columns) if columns else slice(None)]
+        yield empty.to_csv(index=False).encode('utf-8')
+
+
+def iter_csv_gzip(df, mask=None, columns=None, max_rows=None, chunk_rows=CHUNK_ROWS):
+    """Yield the selected rows as gzip-compressed CSV bytes."""
+    compressor = zlib.compressobj(wbits=31)  # 31 = gzip container
+    for piece in iter_csv(df, mask, columns, max_rows, chunk_rows):
+        compressed = compressor.compress(piece)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+class _DrainableSink:
+    """Write-only sink that hands back its buffered bytes on ``drain()``.
+
+    The Parquet writer needs ``tell()`` to keep counting from the start of
+    the file even after earlier bytes have been handed off.
+    """
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+def iter_parquet(df, mask=None, columns=None, max_rows=None, chunk_rows=CHUNK_ROWS):
+    """Yield the selected rows as a Parquet file, one row group per chunk."""
+    sink = _DrainableSink()
+    writer = None
+    for chunk in _row_chunks(df, mask, columns, max_rows, chunk_rows):
+        if writer is None:
+            schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+            writer = pq.ParquetWriter(pa.PythonFile(sink, mode='w'), schema)
+        writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+        yield sink.drain()
+
+    if writer is None:
+        empty = df.iloc[:0, df.columns.get_indexer(columns) if columns else slice(None)]
+        schema = pa.Schema.from_pandas(empty, preserve_index=False)
+        writer = pq.ParquetWriter(pa.PythonFile(sink, mode='w'), schema)
+    writer.close()
+    yield sink.drain()
+
+
+EXPORTERS = {
+    'CSV': iter_csv,
+    'CSV (gzip)': iter_csv_gzip,
+    'Parquet': iter_parquet,
+}
+
+
+def write_export(df, export_format, mask=None, columns=None, max_rows=None, export_dir=EXPORT_DIR):
+    """Write an export chunk by chunk to a randomly named file in ``export_dir``.
+
+    Returns the file name. The file appears under its final name only once
+    complete; a failed export leaves nothing behind.
+    """
+    extension, _ = EXPORT_FORMATS[export_format]
+    os.makedirs(export_dir, exist_ok=True)
+    name = f"{secrets.token_urlsafe(16)}.{extension}"
+    path = os.path.join(export_dir, name)
+    partial_path = path + '.part'
+    try:
+        with open(partial_path, 'wb') as out:
+            for piece in EXPORTERS[export_format](df, mask=mask, columns=columns, max_rows=max_rows):
+                out.write(piece)
+        os.replace(partial_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(partial_path)
+        raise
+    return name
+
+
+def remove_expired_exports(export_dir=EXPORT_DIR, max_age=EXPORT_MAX_AGE_SECONDS):
+    """Delete export files older than ``max_age`` seconds; return how many were removed."""
+    cutoff = time.time() - max_age
+    removed = 0
+    with contextlib.suppress(FileNotFoundError), os.scandir(export_dir) as entries:
+        for entry in entries:
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.unlink(entry.path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+    return removed
+
+
+def start_export_cleanup(export_dir=EXPORT_DIR, max_age=EXPORT_MAX_AGE_SECONDS,
+                         interval=CLEANUP_INTERVAL_SECONDS):
+    """Start a daemon thread that removes expired exports every ``interval`` seconds."""
+    def sweep():
+        while True:
+            remove_expired_exports(export_dir, max_age)
+            time.sleep(interval)
+
+    thread = threading.Thread(target=sweep, name='export-cleanup', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,51 @@
+"""Loading and filtering of the cleaned dataset, shared by the dashboard and offline tools."""
+import numpy as np
+import pandas as pd
+
+DATA_PATH = 'Most Streamed Spotify Songs 2024_cleaned.csv'
+
+NUMERIC_COLUMNS = ['All Time Rank', 'Spotify Streams', 'Spotify Playlist Count', 'Spotify Playlist Reach',
+                   'Spotify Popularity', 'YouTube Views', 'YouTube Likes', 'TikTok Posts',
+                   'TikTok Likes', 'TikTok Views', 'YouTube Playlist Reach',
+                   'Apple Music Playlist Count', 'AirPlay Spins',
+                   'Deezer Playlist Count', 'Deezer Playlist Reach', 'Amazon Playlist Count',
+                   'Pandora Streams', 'Shazam Counts', 'Track Score']
+
+
+def load_dataset(path=DATA_PATH):
+    """Read the cleaned CSV and derive the columns the dashboard filters on."""
+    df = pd.read_csv(path, encoding='latin-1')
+
+    # Convert numeric columns
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    # Parse the full release date and derive the release year
+    if 'Release Date' in df.columns:
+        df['Release Date'] = pd.to_datetime(df['Release Date'], format='%m/%d/%Y', errors='coerce')
+        df['Release Year'] = df['Release Date'].dt.year
+
+    # Ensure Explicit column exists
+    if 'Explicit Track' in df.columns:
+        df['Track Type'] = df['Explicit Track'].apply(lambda x: 'Explicit' if x == True or str(x).lower() == 'true' else 'Clean')
+
+    return df
+
+
+def build_filter_mask(df, track_types=None, year_range=None, score_range=None):
+    """Boolean mask of the rows passing the sidebar filters; empty filters keep every row."""
+    mask = np.ones(len(df), dtype=bool)
+
+    if track_types and 'Track Type' in df.columns:
+        mask &= df['Track Type'].isin(track_types).to_numpy()
+
+    if year_range and 'Release Year' in df.columns:
+        mask &= ((df['Release Year'] >= year_range[0]) &
+                 (df['Release Year'] <= year_range[1])).to_numpy()
+
+    if score_range and 'Track Score' in df.columns:
+        mask &= ((df['Track Score'] >= score_range[0]) &
+                 (df['Track Score'] <= score_range[1])).to_numpy()
+
+    return mask
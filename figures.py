@@ -0,0 +1,383 @@
+"""Plotly figure builders for the dashboard with compact payloads.
+
+All figures share the layout pieces defined here and a small template in
+place of Plotly's large default one. Trace values are rounded to display
+precision and passed as narrow numpy arrays, which Plotly serializes as
+base64 typed arrays instead of decimal text. Built figures are cached by
+a fingerprint of their input data, so an unchanged chart is not rebuilt
+and keeps a byte-identical spec between reruns.
+"""
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+logger = logging.getLogger(__name__)
+
+PLATFORM_COLORS = {
+    'Spotify': '#1DB954',
+    'YouTube': '#0066CC',
+    'TikTok': '#FF6B9D'
+}
+
+TRACK_TYPE_COLORS = {
+    'Explicit': '#FF6B6B',
+    'Clean': '#1DB954'
+}
+
+PLAYLIST_COLOR = '#A855F7'
+
+# Small template replacing Plotly's default one, which adds several KB to every figure
+COMPACT_TEMPLATE = go.layout.Template(layout=dict(colorway=list(PLATFORM_COLORS.values())))
+
+# Shared layout pieces
+CENTERED_TITLE = {'x': 0.5, 'xanchor': 'center', 'font': {'size': 20}}
+
+AXIS_STYLE = dict(
+    showgrid=False,
+    linecolor='black',
+    linewidth=2,
+    title_font=dict(color='black', size=16),
+    tickfont=dict(size=14, color='black')
+)
+
+RANK_AXIS = dict(AXIS_STYLE, tickmode='linear', tick0=1, dtick=1)
+
+TOP_LEGEND = dict(
+    orientation="h",
+    yanchor="bottom",
+    y=1.02,
+    xanchor="right",
+    x=1,
+    font=dict(size=14, color='black')
+)
+
+BASE_LAYOUT = dict(
+    template=COMPACT_TEMPLATE,
+    plot_bgcolor='white',
+    paper_bgcolor='white',
+    font=dict(color='black', size=14)
+)
+
+LINE_STYLE = dict(mode='lines+markers', marker=dict(size=8))
+
+# Built figures kept per (name, data fingerprint)
+FIGURE_CACHE_SIZE = 64
+
+
+def compact_array(values, decimals=None):
+    """Round ``values`` to ``decimals`` places and downcast for typed-array encoding.
+
+    Whole numbers become the narrowest integer type that holds them. Other
+    values become float32 when that keeps the rounded precision.
+    """
+    arr = np.asarray(values, dtype=float)
+    if decimals is not None:
+        arr = np.round(arr, decimals)
+
+    if len(arr) == 0 or not np.isfinite(arr).all():
+        return arr
+    if (arr == np.round(arr)).all():
+        for dtype in (np.int8, np.int16, np.int32):
+            info = np.iinfo(dtype)
+            if info.min <= arr.min() and arr.max() <= info.max:
+                return arr.astype(dtype)
+        return arr
+    if decimals is not None:
+        as_float32 = arr.astype(np.float32)
+        if np.abs(as_float32 - arr).max() < 0.5 * 10.0 ** -decimals:
+            return as_float32
+    return arr
+
+
+def format_engagement(num):
+    """Format a count with M (million) and B (billion) suffixes."""
+    if num >= 1e9:
+        return f'{num/1e9:.1f}B'
+    elif num >= 1e6:
+        return f'{num/1e6:.1f}M'
+    else:
+        return f'{num:.0f}'
+
+
+def rank_trends_figure(top15):
+    """Spotify, YouTube and TikTok engagement (billions) for the top songs by rank."""
+    fig = go.Figure()
+    ranks = compact_array(top15['All Time Rank'])
+
+    for platform, column in [('Spotify', 'Spotify Streams'), ('YouTube', 'YouTube Views'), ('TikTok', 'TikTok Views')]:
+        fig.add_trace(go.Scatter(
+            x=ranks,
+            y=compact_array(top15[column] / 1e9, decimals=3),
+            name=column,
+            line=dict(color=PLATFORM_COLORS[platform], width=3),
+            **LINE_STYLE
+        ))
+
+    fig.update_layout(
+        BASE_LAYOUT,
+        title=dict(CENTERED_TITLE, text='<b>Top 15 Songs by Rank: Do YouTube & TikTok Trends Follow Spotify Success?</b>'),
+        xaxis_title='<b>All Time Rank (Lower = Better)</b>',
+        yaxis_title='<b>Engagement (Billions)</b>',
+        height=600,
+        hovermode='x unified',
+        legend=TOP_LEGEND,
+        xaxis=RANK_AXIS,
+        yaxis=dict(AXIS_STYLE, ticksuffix='B')
+    )
+    return fig
+
+
+def platform_share_figure(platform_totals):
+    """Donut chart of total engagement per platform."""
+    fig = go.Figure(go.Pie(
+        labels=platform_totals['Platform'].tolist(),
+        values=compact_array(platform_totals['Total Engagement'], decimals=0),
+        marker=dict(colors=[PLATFORM_COLORS[p] for p in platform_totals['Platform']]),
+        hole=0.4,
+        textposition='inside',
+        textinfo='percent+label',
+        hovertemplate='<b>%{label}</b><br>Engagement: %{value:,.0f}<br>Share: %{percent}<extra></extra>',
+        textfont=dict(size=16, color='white')
+    ))
+
+    fig.update_layout(
+        BASE_LAYOUT,
+        height=500,
+        title=dict(CENTERED_TITLE, text='<b>Market Share of Total Engagement Across Platforms</b>'),
+        font=dict(color='black', size=16),
+        legend=dict(
+            x=0.5,
+            y=0.5,
+            xanchor='center',
+            yanchor='middle',
+            bgcolor='rgba(255,255,255,0.8)',
+            bordercolor='black',
+            borderwidth=1,
+            font=dict(size=16, color='black')
+        ),
+        showlegend=True
+    )
+    return fig
+
+
+def playlist_influence_figure(top15):
+    """Spotify streams (billions) against playlist count for the top songs by rank."""
+    ranks = compact_array(top15['All Time Rank'])
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=ranks,
+        y=compact_array(top15['Spotify Streams'] / 1e9, decimals=3),
+        name='Spotify Streams (Billions)',
+        line=dict(color=PLATFORM_COLORS['Spotify'], width=3),
+        yaxis='y',
+        **LINE_STYLE
+    ))
+    # Playlist count on the secondary y-axis
+    fig.add_trace(go.Scatter(
+        x=ranks,
+        y=compact_array(top15['Spotify Playlist Count'], decimals=0),
+        name='Playlist Count',
+        line=dict(color=PLAYLIST_COLOR, width=3),
+        yaxis='y2',
+        **LINE_STYLE
+    ))
+
+    fig.update_layout(
+        BASE_LAYOUT,
+        title=dict(CENTERED_TITLE, text='<b>Top 15 Songs by Rank: Does Playlist Count Influence Streams?</b>'),
+        xaxis_title='<b>All Time Rank (Lower = Better)</b>',
+        yaxis=dict(
+            AXIS_STYLE,
+            title=dict(text='<b>Spotify Streams (Billions)</b>', font=dict(color='black', size=16)),
+            ticksuffix='B'
+        ),
+        yaxis2=dict(
+            AXIS_STYLE,
+            title=dict(text='<b>Playlist Count</b>', font=dict(color='black', size=16)),
+            anchor='x',
+            overlaying='y',
+            side='right'
+        ),
+        height=600,
+        hovermode='x unified',
+        legend=TOP_LEGEND,
+        xaxis=RANK_AXIS
+    )
+    return fig
+
+
+def explicit_comparison_figure(platform_comparison):
+    """Grouped bars of average engagement per platform for explicit and clean songs."""
+    platforms = ['Spotify Streams', 'YouTube Views', 'TikTok Views']
+
+    fig = go.Figure()
+    for _, row in platform_comparison.iterrows():
+        averages = row[platforms].to_numpy(dtype=float)
+        fig.add_trace(go.Bar(
+            x=platforms,
+            y=compact_array(averages, decimals=0),
+            name=row['Track Type'],
+            marker_color=TRACK_TYPE_COLORS.get(row['Track Type']),
+            text=[format_engagement(value) for value in averages],
+            texttemplate='%{text}',
+            textposition='outside',
+            textfont=dict(size=16, color='black'),
+            hovertemplate='%{x}<br>%{y:,.0f}<extra>%{fullData.name}</extra>'
+        ))
+
+    fig.update_layout(
+        BASE_LAYOUT,
+        barmode='group',
+        height=500,
+        title=dict(CENTERED_TITLE, text='<b>Explicit vs Clean Songs: Average Performance by Platform</b>'),
+        xaxis=dict(AXIS_STYLE, tickfont=dict(size=16, color='black')),
+        yaxis=AXIS_STYLE,
+        xaxis_title='<b>Platform</b>',
+        yaxis_title='<b>Average Engagement</b>',
+        legend=dict(TOP_LEGEND, title_text='Track Type')
+    )
+    return fig
+
+
+def release_trend_figure(rollup, resolution):
+    """Track count (bars) and total Spotify streams (line) per release period."""
+    periods = rollup.index.astype(str).tolist()
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=periods,
+        y=compact_array(rollup['Tracks']),
+        name='Tracks Released',
+        marker_color=PLAYLIST_COLOR
+    ))
+    fig.add_trace(go.Scatter(
+        x=periods,
+        y=compact_array(rollup['Spotify Streams'] / 1e9, decimals=3),
+        name='Spotify Streams (Billions)',
+        line=dict(color=PLATFORM_COLORS['Spotify'], width=3),
+        mode='lines',
+        yaxis='y2'
+    ))
+
+    fig.update_layout(
+        BASE_LAYOUT,
+        title=dict(CENTERED_TITLE, text=f'<b>Tracks and Spotify Streams by Release {resolution}</b>'),
+        xaxis=dict(AXIS_STYLE, title=f'<b>Release {resolution}</b>', type='category'),
+        yaxis=dict(AXIS_STYLE, title='<b>Tracks Released</b>'),
+        yaxis2=dict(
+            AXIS_STYLE,
+            title=dict(text='<b>Spotify Streams (Billions)</b>', font=dict(color='black', size=16)),
+            overlaying='y',
+            side='right',
+            ticksuffix='B'
+        ),
+        height=500,
+        hovermode='x unified',
+        legend=TOP_LEGEND
+    )
+    return fig
+
+
+def platform_mix_figure(rollup, resolution):
+    """Share of Spotify, YouTube and TikTok engagement per release period."""
+    periods = rollup.index.astype(str).tolist()
+    columns = {'Spotify': 'Spotify Streams', 'YouTube': 'YouTube Views', 'TikTok': 'TikTok Views'}
+    engagement = rollup[list(columns.values())]
+    shares = engagement.div(engagement.sum(axis=1).replace(0, np.nan), axis=0).fillna(0) * 100
+
+    fig = go.Figure()
+    for platform, column in columns.items():
+        fig.add_trace(go.Scatter(
+            x=periods,
+            y=compact_array(shares[column], decimals=1),
+            name=platform,
+            mode='lines',
+            stackgroup='mix',
+            line=dict(color=PLATFORM_COLORS[platform], width=1),
+            hovertemplate='%{y:.1f}%'
+        ))
+
+    fig.update_layout(
+        BASE_LAYOUT,
+        title=dict(CENTERED_TITLE, text=f'<b>Platform Mix by Release {resolution}</b>'),
+        xaxis=dict(AXIS_STYLE, title=f'<b>Release {resolution}</b>', type='category'),
+        yaxis=dict(AXIS_STYLE, title='<b>Share of Engagement</b>', ticksuffix='%', range=[0, 100]),
+        height=450,
+        hovermode='x unified',
+        legend=TOP_LEGEND
+    )
+    return fig
+
+
+def slider_histogram_figure(histogram):
+    """Small bar chart of the distribution behind a sidebar slider.
+
+    ``histogram`` has a 'Tracks' count per bin and an 'In Range' flag;
+    bins inside the slider range are highlighted.
+    """
+    colors = np.where(histogram['In Range'], PLATFORM_COLORS['Spotify'], '#D1D5DB')
+
+    fig = go.Figure(go.Bar(
+        x=compact_array(histogram.index, decimals=2),
+        y=compact_array(histogram['Tracks']),
+        marker=dict(color=colors.tolist(), line_width=0),
+        hovertemplate='%{x}: %{y} tracks<extra></extra>'
+    ))
+    fig.update_layout(
+        BASE_LAYOUT,
+        height=80,
+        margin=dict(l=0, r=0, t=0, b=0),
+        bargap=0.05,
+        showlegend=False,
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False)
+    )
+    return fig
+
+
+def data_fingerprint(data):
+    """Content hash of a DataFrame (values, index and columns)."""
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    digest.update(repr(list(data.columns)).encode('utf-8'))
+    return digest.hexdigest()
+
+
+_figure_cache = OrderedDict()
+_figure_cache_lock = threading.Lock()
+
+
+def cached_figure(name, builder, data):
+    """Return ``builder(data)``, reusing the figure built for identical data.
+
+    A reused figure serializes to the same spec, so with the lowered
+    ``global.minCachedMessageSize`` in ``.streamlit/config.toml`` Streamlit
+    sends it to a browser that already has it as a hash reference.
+    Streamlit still serializes the figure on every ``st.plotly_chart``
+    call. The spec size is measured once when the figure is built and
+    logged on every call.
+    """
+    key = (name, data_fingerprint(data))
+    with _figure_cache_lock:
+        entry = _figure_cache.get(key)
+        if entry is not None:
+            _figure_cache.move_to_end(key)
+
+    if entry is None:
+        fig = builder(data)
+        entry = (fig, len(pio.to_json(fig, validate=False).encode('utf-8')))
+        with _figure_cache_lock:
+            _figure_cache[key] = entry
+            if len(_figure_cache) > FIGURE_CACHE_SIZE:
+                _figure_cache.popitem(last=False)
+        logger.info("%s: %s bytes (built)", name, f"{entry[1]:,}")
+    else:
+        logger.info("%s: %s bytes (cached)", name, f"{entry[1]:,}")
+    return entry[0]
@@ -0,0 +1,102 @@
+"""Constant-time track counts and slider previews for the sidebar filter ranges.
+
+For every Track Type a 2D cumulative count table over (Release Year,
+Track Score) is built once. The number of tracks inside any year and
+score range is then four table lookups per Track Type, and the slider
+histograms are differences of rows or columns of the same tables.
+
+Past ``MAX_SCORE_LEVELS`` distinct scores the score axis is binned by
+quantile. The histograms stay usable as previews, but ``count()`` is
+only exact while ``exact_counts`` is true; otherwise the dashboard counts
+from the filter mask.
+"""
+import numpy as np
+import pandas as pd
+
+# Distinct score levels kept in the tables; beyond this scores are binned by quantile
+MAX_SCORE_LEVELS = 16_384
+
+# Bars in the Track Score slider histogram
+SCORE_HISTOGRAM_BINS = 30
+
+
+class RangeCounts:
+    """Cumulative count tables per Track Type over release year and track score."""
+
+    def __init__(self, df, max_score_levels=MAX_SCORE_LEVELS):
+        years = df['Release Year'].to_numpy(dtype=float)
+        scores = df['Track Score'].to_numpy(dtype=float)
+        # Rows without a year or score never pass the range filters
+        keep = ~np.isnan(years) & ~np.isnan(scores)
+
+        type_codes, self.track_types = pd.factorize(df['Track Type'])
+        type_codes, years, scores = type_codes[keep], years[keep].astype(int), scores[keep]
+
+        self.first_year = int(years.min()) if len(years) else 2000
+        self.years = np.arange(self.first_year, (int(years.max()) if len(years) else 2000) + 1)
+
+        self.score_levels = np.unique(scores)
+        # Every distinct score has its own level, so range counts are exact
+        self.exact_counts = len(self.score_levels) <= max_score_levels
+        if not self.exact_counts:
+            self.score_levels = np.unique(np.quantile(scores, np.linspace(0, 1, max_score_levels)))
+        score_ranks = np.searchsorted(self.score_levels, scores, side='left')
+
+        counts = np.zeros((len(self.track_types), len(self.years), len(self.score_levels)), dtype=np.int64)
+        np.add.at(counts, (type_codes, years - self.first_year, score_ranks), 1)
+
+        # tables[t, y, s] = tracks of type t with year index < y and score rank < s
+        self.tables = np.zeros((len(self.track_types), len(self.years) + 1, len(self.score_levels) + 1),
+                               dtype=np.int64)
+        self.tables[:, 1:, 1:] = counts.cumsum(axis=1).cumsum(axis=2)
+
+    def _selected(self, track_types):
+        if not track_types:
+            return self.tables.sum(axis=0)
+        codes = [i for i, t in enumerate(self.track_types) if t in track_types]
+        return self.tables[codes].sum(axis=0)
+
+    def _year_bounds(self, year_range):
+        if not year_range:
+            return 0, len(self.years)
+        lo = np.clip(year_range[0] - self.first_year, 0, len(self.years))
+        hi = np.clip(year_range[1] - self.first_year + 1, 0, len(self.years))
+        return int(lo), int(max(hi, lo))
+
+    def _score_bounds(self, score_range):
+        if not score_range:
+            return 0, len(self.score_levels)
+        lo = np.searchsorted(self.score_levels, score_range[0], side='left')
+        hi = np.searchsorted(self.score_levels, score_range[1], side='right')
+        return int(lo), int(max(hi, lo))
+
+    def count(self, track_types=None, year_range=None, score_range=None):
+        """Number of tracks matching the Track Type, Release Year and Track Score filters.
+
+        Exact only while ``exact_counts`` is true.
+        """
+        table = self._selected(track_types)
+        y0, y1 = self._year_bounds(year_range)
+        s0, s1 = self._score_bounds(score_range)
+        return int(table[y1, s1] - table[y0, s1] - table[y1, s0] + table[y0, s0])
+
+    def year_histogram(self, track_types=None, score_range=None):
+        """Tracks per release year within the score range."""
+        table = self._selected(track_types)
+        s0, s1 = self._score_bounds(score_range)
+        per_year = np.diff(table[:, s1] - table[:, s0])
+        return pd.Series(per_year, index=self.years, name='Tracks')
+
+    def score_histogram(self, track_types=None, year_range=None, bins=SCORE_HISTOGRAM_BINS):
+        """Tracks per equal-width score bin within the year range."""
+        table = self._selected(track_types)
+        y0, y1 = self._year_bounds(year_range)
+        cumulative = table[y1] - table[y0]
+
+        lo = self.score_levels[0] if len(self.score_levels) else 0.0
+        hi = self.score_levels[-1] if len(self.score_levels) else 1.0
+        edges = np.linspace(lo, hi, bins + 1)
+        ranks = np.searchsorted(self.score_levels, edges, side='left')
+        ranks[-1] = len(self.score_levels)
+        per_bin = np.diff(cumulative[ranks])
+        return pd.Series(per_bin, index=(edges[:-1] + edges[1:]) / 2, name='Tracks')
@@ -0,0 +1,430 @@
+"""Concurrent-session load test for the Streamlit dashboard.
+
+Starts ``dashboard.py`` on a local Streamlit server and connects N
+simulated viewers over the websocket protocol the browser uses. Each
+viewer replays randomized interactions (Track Type, year and score
+ranges, fast mode, trend resolution), sending the widget states and
+cached message hashes a browser would, and times every rerun from
+request to ``script_finished``. For each session count the harness
+reports rerun latency percentiles, throughput, server RSS and the cache
+and session-state memory from the server's ``/_stcore/metrics``
+endpoint, and marks the saturation point where more sessions stop
+adding throughput. Everything runs offline on localhost; the plot
+embeds plotly.js.
+
+Fragment auto-refreshes (fast mode's polling for exact values) are not
+replayed; the exact computation still runs on the server.
+
+Usage:
+    python load_test.py                                # 1, 2, 4, 8 and 16 sessions
+    python load_test.py --sessions 1 4 16 32 --interactions 12
+    python load_test.py --think-time 2                 # viewers pause ~2s between changes
+    python load_test.py --report load_test.json --plot load_test.html
+"""
+import argparse
+import asyncio
+import json
+import platform
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime, timezone
+
+import numpy as np
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+import streamlit
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.Slider_pb2 import Slider
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+APP_PATH = 'dashboard.py'
+REPORT_PATH = 'load_test_report.json'
+PLOT_PATH = 'load_test.html'
+
+SESSION_LEVELS = [1, 2, 4, 8, 16]
+INTERACTIONS_PER_SESSION = 8
+RERUN_TIMEOUT = 300
+SERVER_START_TIMEOUT = 60
+
+# The server recomputes cache_memory_bytes at most this often (seconds)
+METRICS_TTL = 5.0
+
+# Saturated once the next session count adds less than this much throughput
+SATURATION_GAIN = 0.10
+
+# Controls a simulated viewer changes, by label, with their element type
+INTERACTIVE_WIDGETS = {
+    'Track Type': 'multiselect',
+    'Release Year Range': 'slider',
+    'Track Score Range': 'slider',
+    'Fast Mode (approximate)': 'checkbox',
+    'Resolution': 'radio',
+}
+
+CACHE_MEMORY_LINE = re.compile(r'^cache_memory_bytes\{cache_type="([^"]*)",cache="([^"]*)"\} (\d+)', re.MULTILINE)
+
+
+def proc_status_mb(pid, field):
+    """Memory field of /proc/<pid>/status (e.g. VmRSS, VmHWM) in MB."""
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1]) / 1024
+    return float('nan')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port):
+    """Run the dashboard on a headless local server and wait until it is healthy."""
+    log = tempfile.TemporaryFile()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', APP_PATH,
+         '--server.headless=true', '--server.address=127.0.0.1', f'--server.port={port}',
+         '--server.fileWatcherType=none', '--server.enableExpensiveMemoryStats=true',
+         '--browser.gatherUsageStats=false', '--logger.level=error'],
+        stdout=log, stderr=subprocess.STDOUT
+    )
+
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline and server.poll() is None:
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/_stcore/health', timeout=1) as response:
+                if response.status == 200:
+                    return server
+        except OSError:
+            time.sleep(0.2)
+
+    server.kill()
+    log.seek(0)
+    output = log.read().decode('utf-8', 'replace')[-2000:]
+    raise SystemExit(f"Streamlit server did not start on port {port}:\n{output}")
+
+
+class MemoryMetrics:
+    """Reads cache and session-state memory from the server's metrics endpoint."""
+
+    def __init__(self, base_url):
+        self.url = f'{base_url}/_stcore/metrics?families=cache_memory_bytes'
+        self._last_read = float('-inf')
+
+    def read(self):
+        """Bytes per (cache type, cache name), waiting out the server's stats TTL."""
+        time.sleep(max(0.0, self._last_read + METRICS_TTL + 0.1 - time.monotonic()))
+        with urllib.request.urlopen(self.url, timeout=60) as response:
+            text = response.read().decode('utf-8')
+        self._last_read = time.monotonic()
+
+        sizes = {}
+        for cache_type, cache, size in CACHE_MEMORY_LINE.findall(text):
+            key = (cache_type, cache.split('.')[-1])
+            sizes[key] = sizes.get(key, 0) + int(size)
+        return sizes
+
+
+def total_mb(sizes, cache_types):
+    return round(sum(size for (cache_type, _), size in sizes.items() if cache_type in cache_types) / 1024 ** 2, 2)
+
+
+class ViewerSession:
+    """One simulated browser tab connected to the dashboard."""
+
+    def __init__(self, url, seed):
+        self.url = url
+        self.rng = np.random.default_rng(seed)
+        self.websocket = None
+        self.widgets = {}
+        self.widget_states = {}
+        self.cached_hashes = set()
+        self.latencies = []
+        self.bytes_received = 0
+        self.errors = 0
+
+    async def connect(self):
+        self.websocket = await websockets.connect(self.url, max_size=None)
+
+    async def close(self):
+        if self.websocket is not None:
+            await self.websocket.close()
+
+    async def rerun(self):
+        """Request a rerun with the current widget states and wait for it to finish."""
+        back_msg = BackMsg()
+        client_state = back_msg.rerun_script
+        client_state.widget_states.widgets.extend(self.widget_states.values())
+        client_state.cached_message_hashes.extend(self.cached_hashes)
+
+        start = time.perf_counter()
+        await self.websocket.send(back_msg.SerializeToString())
+        while True:
+            data = await self.websocket.recv()
+            self.bytes_received += len(data)
+            msg = ForwardMsg()
+            msg.ParseFromString(data)
+            if msg.metadata.cacheable:
+                self.cached_hashes.add(msg.hash)
+
+            kind = msg.WhichOneof('type')
+            if kind == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+                self._on_element(msg.delta.new_element)
+            elif kind == 'script_finished' and msg.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                break
+        self.latencies.append(time.perf_counter() - start)
+
+    def _on_element(self, element):
+        element_type = element.WhichOneof('type')
+        if element_type == 'exception':
+            self.errors += 1
+            return
+        if element_type not in INTERACTIVE_WIDGETS.values():
+            return
+        proto = getattr(element, element_type)
+        if INTERACTIVE_WIDGETS.get(proto.label) == element_type:
+            self.widgets[proto.label] = proto
+
+    def random_interaction(self):
+        """Change one of the interactive widgets at random; returns its label."""
+        label = self.rng.choice(sorted(self.widgets))
+        proto = self.widgets[label]
+        state = WidgetState(id=proto.id)
+        element_type = INTERACTIVE_WIDGETS[label]
+
+        if element_type == 'multiselect':
+            options = list(proto.options)
+            picked = [o for o in options if self.rng.random() < 0.7] or [options[self.rng.integers(len(options))]]
+            state.string_array_value.data.extend(picked)
+        elif element_type == 'slider':
+            state.double_array_value.data.extend(self._random_range(proto))
+        elif element_type == 'checkbox':
+            previous = self.widget_states.get(label)
+            state.bool_value = not (previous.bool_value if previous is not None else proto.default)
+        else:
+            state.string_value = proto.options[self.rng.integers(len(proto.options))]
+
+        self.widget_states[label] = state
+        return label
+
+    def _random_range(self, proto):
+        """Full range one time in five, otherwise a random sub-range on the step grid."""
+        if self.rng.random() < 0.2:
+            return [proto.min, proto.max]
+        steps = int(round((proto.max - proto.min) / proto.step))
+        lo, hi = sorted(int(i) for i in self.rng.integers(0, steps + 1, size=2))
+        values = [proto.min + lo * proto.step, proto.min + hi * proto.step]
+        if proto.data_type == Slider.INT:
+            return [float(round(v)) for v in values]
+        return [round(v, 2) for v in values]
+
+    async def replay(self, interactions, think_time):
+        """Open the page, then make ``interactions`` random changes."""
+        try:
+            await asyncio.wait_for(self.rerun(), RERUN_TIMEOUT)
+            for _ in range(interactions):
+                if think_time:
+                    await asyncio.sleep(self.rng.exponential(think_time))
+                if self.widgets:
+                    self.random_interaction()
+                await asyncio.wait_for(self.rerun(), RERUN_TIMEOUT)
+        except (asyncio.TimeoutError, websockets.ConnectionClosed):
+            self.errors += 1
+
+
+async def run_level(ws_url, num_sessions, interactions, think_time, seed=0):
+    """Connect ``num_sessions`` viewers and replay their interactions concurrently.
+
+    Returns the sessions, still connected, and the wall time of the replay.
+    """
+    sessions = [ViewerSession(ws_url, seed * 1000 + i) for i in range(num_sessions)]
+    await asyncio.gather(*(session.connect() for session in sessions))
+    start = time.perf_counter()
+    await asyncio.gather(*(session.replay(interactions, think_time) for session in sessions))
+    return sessions, time.perf_counter() - start
+
+
+def summarize_level(sessions, wall, server_pid, baseline_rss, memory):
+    latencies = np.concatenate([session.latencies for session in sessions]) * 1000
+
+    def percentile(q):
+        return round(float(np.percentile(latencies, q)), 1) if len(latencies) else None
+
+    rss = proc_status_mb(server_pid, 'VmRSS')
+    return {
+        'sessions': len(sessions),
+        'reruns': len(latencies),
+        'errors': sum(session.errors for session in sessions),
+        'wall_seconds': round(wall, 3),
+        'throughput_rps': round(len(latencies) / wall, 3),
+        'p50_ms': percentile(50),
+        'p95_ms': percentile(95),
+        'p99_ms': percentile(99),
+        'max_ms': percentile(100),
+        'kb_per_rerun': round(sum(s.bytes_received for s in sessions) / max(len(latencies), 1) / 1024, 1),
+        'rss_mb': round(rss, 1),
+        'peak_rss_mb': round(proc_status_mb(server_pid, 'VmHWM'), 1),
+        'per_session_mb': round((rss - baseline_rss) / len(sessions), 2),
+        'session_state_mb': total_mb(memory, {'st_session_state'}),
+        'cache_mb': total_mb(memory, {'st_cache_data', 'st_cache_resource'}),
+    }
+
+
+def find_saturation(levels, gain=SATURATION_GAIN):
+    """Session count beyond which throughput grows by less than ``gain``.
+
+    Returns None when throughput is still scaling at the largest level.
+    """
+    for current, following in zip(levels, levels[1:]):
+        if following['throughput_rps'] < current['throughput_rps'] * (1 + gain):
+            return current['sessions']
+    return None
+
+
+def plot_levels(levels, saturation, path):
+    """Write latency, throughput and memory against session count to a standalone HTML file."""
+    sessions = [level['sessions'] for level in levels]
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.1,
+                        specs=[[{'secondary_y': True}], [{}]],
+                        subplot_titles=('Rerun Latency and Throughput', 'Server Memory'))
+
+    for key, name, dash in [('p50_ms', 'p50', 'solid'), ('p95_ms', 'p95', 'dash'), ('p99_ms', 'p99', 'dot')]:
+        fig.add_trace(go.Scatter(x=sessions, y=[level[key] for level in levels], name=f'{name} latency (ms)',
+                                 mode='lines+markers', line=dict(color='#0066CC', dash=dash)), row=1, col=1)
+    fig.add_trace(go.Scatter(x=sessions, y=[level['throughput_rps'] for level in levels],
+                             name='Throughput (reruns/s)', mode='lines+markers',
+                             line=dict(color='#1DB954', width=3)), row=1, col=1, secondary_y=True)
+
+    for key, name, color in [('rss_mb', 'Server RSS', '#A855F7'), ('cache_mb', 'Cache memory', '#FF6B9D'),
+                             ('session_state_mb', 'Session state', '#FF6B6B')]:
+        fig.add_trace(go.Scatter(x=sessions, y=[level[key] for level in levels], name=f'{name} (MB)',
+                                 mode='lines+markers', line=dict(color=color)), row=2, col=1)
+
+    if saturation is not None:
+        fig.add_vline(x=saturation, line=dict(color='#FF6B6B', dash='dash'),
+                      annotation_text=f'saturation: {saturation} sessions')
+
+    for row in (1, 2):
+        fig.update_xaxes(type='log', tickvals=sessions, row=row, col=1)
+    fig.update_xaxes(title_text='Concurrent sessions', row=2, col=1)
+    fig.update_yaxes(title_text='Latency (ms)', row=1, col=1)
+    fig.update_yaxes(title_text='Reruns/s', row=1, col=1, secondary_y=True)
+    fig.update_yaxes(title_text='MB', row=2, col=1)
+    fig.update_layout(title='Dashboard Load Test', height=800, plot_bgcolor='white', hovermode='x unified')
+    fig.write_html(path, include_plotlyjs=True)
+
+
+def print_levels(report):
+    print(f"\nWarm-up: {report['warmup_seconds']:.2f}s, baseline server RSS {report['baseline_rss_mb']:.1f} MB")
+    for name, mb in report['caches'].items():
+        print(f"  {name}: {mb:.2f} MB")
+
+    def fmt(value, spec):
+        return format(value, spec) if value is not None else '-'
+
+    print(f"\n{'Sessions':>8}{'Reruns':>8}{'Errors':>8}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}"
+          f"{'Reruns/s':>10}{'KB/rerun':>10}{'RSS (MB)':>10}{'MB/sess':>9}{'State MB':>10}{'Cache MB':>10}")
+    print("-" * 113)
+    for level in report['levels']:
+        print(f"{level['sessions']:>8}{level['reruns']:>8}{level['errors']:>8}{fmt(level['p50_ms'], '.1f'):>10}"
+              f"{fmt(level['p95_ms'], '.1f'):>10}{fmt(level['p99_ms'], '.1f'):>10}{level['throughput_rps']:>10.2f}"
+              f"{level['kb_per_rerun']:>10.1f}{level['rss_mb']:>10.1f}{level['per_session_mb']:>9.2f}"
+              f"{level['session_state_mb']:>10.2f}{level['cache_mb']:>10.2f}")
+
+    if report['saturation_sessions'] is None:
+        print("\nThroughput was still scaling at the largest session count.")
+    else:
+        print(f"\nSaturation at {report['saturation_sessions']} sessions "
+              f"(more sessions add less than {SATURATION_GAIN:.0%} throughput).")
+
+
+async def run_load_test(args, server_pid, base_url, ws_url):
+    metrics = MemoryMetrics(base_url)
+
+    # One viewer fills the shared caches first, so the levels measure steady state
+    warmup = ViewerSession(ws_url, seed=0)
+    await warmup.connect()
+    start = time.perf_counter()
+    await warmup.replay(0, 0)
+    warmup_seconds = time.perf_counter() - start
+    await warmup.close()
+    if warmup.errors:
+        raise SystemExit(f"{APP_PATH} failed on its first run; fix it before load testing")
+    baseline_rss = proc_status_mb(server_pid, 'VmRSS')
+
+    levels = []
+    for num_sessions in sorted(set(args.sessions)):
+        print(f"Running {num_sessions} concurrent session(s)...")
+        sessions, wall = await run_level(ws_url, num_sessions, args.interactions, args.think_time, seed=args.seed)
+        # Read memory while the sessions are still connected
+        memory = await asyncio.to_thread(metrics.read)
+        levels.append(summarize_level(sessions, wall, server_pid, baseline_rss, memory))
+        await asyncio.gather(*(session.close() for session in sessions))
+
+    memory = await asyncio.to_thread(metrics.read)
+    caches = {f'{cache_type}:{name}': round(size / 1024 ** 2, 2)
+              for (cache_type, name), size in sorted(memory.items()) if cache_type != 'st_session_state'}
+    return {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'streamlit': streamlit.__version__,
+        'app': APP_PATH,
+        'interactions_per_session': args.interactions,
+        'think_time_seconds': args.think_time,
+        'warmup_seconds': round(warmup_seconds, 3),
+        'baseline_rss_mb': round(baseline_rss, 1),
+        'caches': caches,
+        'levels': levels,
+        'saturation_sessions': find_saturation(levels),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the dashboard with concurrent simulated viewers.")
+    parser.add_argument('--sessions', nargs='+', type=int, default=SESSION_LEVELS, metavar='N',
+                        help=f"Concurrent session counts to test (default: {' '.join(map(str, SESSION_LEVELS))})")
+    parser.add_argument('--interactions', type=int, default=INTERACTIONS_PER_SESSION,
+                        help=f"Random widget changes per session after opening the page "
+                             f"(default: {INTERACTIONS_PER_SESSION})")
+    parser.add_argument('--think-time', type=float, default=0.0,
+                        help="Mean pause in seconds between a viewer's changes (default: 0, back to back)")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the random interactions")
+    parser.add_argument('--port', type=int, help="Port for the dashboard server (default: a free port)")
+    parser.add_argument('--report', default=REPORT_PATH, help=f"JSON report path (default: {REPORT_PATH})")
+    parser.add_argument('--plot', default=PLOT_PATH, help=f"HTML plot path (default: {PLOT_PATH})")
+    args = parser.parse_args(argv)
+
+    print("="*70)
+    print("DASHBOARD LOAD TEST")
+    print("="*70)
+
+    port = args.port or free_port()
+    server = start_server(port)
+    try:
+        report = asyncio.run(run_load_test(args, server.pid, f'http://127.0.0.1:{port}',
+                                           f'ws://127.0.0.1:{port}/_stcore/stream'))
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+    with open(args.report, 'w') as f:
+        json.dump(report, f, indent=2)
+    plot_levels(report['levels'], report['saturation_sessions'], args.plot)
+
+    print_levels(report)
+    print(f"\nReport written to '{args.report}', plot to '{args.plot}'")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+"""Key metric, platform share and explicit-vs-clean computations.
+
+``exact_summary`` computes the values shown in the Key Metrics, Q2 and Q4
+sections; ``top_ranked`` and the frame helpers prepare the data the Q1-Q4
+figures plot. ``StratifiedSampler`` estimates the summary values from a
+sample stratified by Track Type and Release Year, with 95% confidence
+margins, for the dashboard's fast mode.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+PLATFORM_COLUMNS = {
+    'Spotify': 'Spotify Streams',
+    'YouTube': 'YouTube Views',
+    'TikTok': 'TikTok Views'
+}
+
+# z-score of a two-sided 95% confidence interval
+Z_95 = 1.96
+
+# Fewest sampled rows per stratum, so every stratum has a variance estimate
+MIN_PER_STRATUM = 5
+
+# A value with its 95% confidence margin (None when exact)
+Estimate = namedtuple('Estimate', ['value', 'margin'])
+
+
+def exact_summary(df, mask):
+    """Compute the summary values exactly over the rows selected by ``mask``."""
+    df_filtered = df[mask]
+    num_rows = len(df_filtered)
+
+    summary = {
+        'exact': True,
+        'total_songs': num_rows,
+        'avg_streams': Estimate(df_filtered['Spotify Streams'].mean(), None),
+        'avg_score': Estimate(df_filtered['Track Score'].mean(), None),
+        'explicit_pct': Estimate((df_filtered['Track Type'] == 'Explicit').sum() / num_rows * 100
+                                 if num_rows else float('nan'), None),
+        'top_artist': df_filtered['Artist'].value_counts().index[0] if num_rows else None,
+    }
+
+    totals = {platform: df_filtered[column].sum() for platform, column in PLATFORM_COLUMNS.items()}
+    grand_total = sum(totals.values())
+    summary['platform_totals'] = {p: Estimate(t, None) for p, t in totals.items()}
+    summary['platform_shares'] = {p: Estimate(t / grand_total if grand_total else float('nan'), None)
+                                  for p, t in totals.items()}
+
+    means = df_filtered.groupby('Track Type')[list(PLATFORM_COLUMNS.values())].mean()
+    summary['explicit_means'] = {
+        track_type: {column: Estimate(value, None) for column, value in row.items()}
+        for track_type, row in means.iterrows()
+    }
+    return summary
+
+
+def top_ranked(df, columns, fill_columns=(), n=15):
+    """The ``n`` best-ranked tracks (lowest All Time Rank) in rank order.
+
+    Tracks without a rank are skipped; missing values in ``fill_columns``
+    become 0 for plotting.
+    """
+    ranked = df.dropna(subset=['All Time Rank']).nsmallest(n, 'All Time Rank')
+    top = ranked[['Track', 'Artist', 'All Time Rank', *columns]].copy()
+    for column in fill_columns:
+        top[column] = top[column].fillna(0)
+    return top.sort_values('All Time Rank')
+
+
+def platform_totals_frame(summary):
+    """Total engagement per platform from a summary, as plotted in Q2."""
+    return pd.DataFrame({
+        'Platform': list(summary['platform_totals']),
+        'Total Engagement': [estimate.value for estimate in summary['platform_totals'].values()]
+    })
+
+
+def explicit_comparison_frame(summary):
+    """Average engagement per platform by Track Type from a summary, as plotted in Q4."""
+    return pd.DataFrame([
+        {'Track Type': track_type, **{column: estimate.value for column, estimate in means.items()}}
+        for track_type, means in summary['explicit_means'].items()
+    ], columns=['Track Type', *PLATFORM_COLUMNS.values()])
+
+
+class StratifiedSampler:
+    """Stratified samples drawn from one precomputed random permutation.
+
+    Rows are shuffled once and grouped by stratum, keeping the shuffled
+    order inside each stratum. A sample takes a prefix of every stratum's
+    filtered rows, so a larger fraction extends the smaller sample rather
+    than drawing a new one.
+    """
+
+    def __init__(self, df, strata_columns=('Track Type', 'Release Year'), seed=0):
+        # Combine per-column codes into one stratum id (missing values form their own level)
+        combined = np.zeros(len(df), dtype=np.int64)
+        for column in strata_columns:
+            column_codes, levels = pd.factorize(df[column], use_na_sentinel=False)
+            combined = combined * (len(levels) + 1) + column_codes
+        _, self.codes = np.unique(combined, return_inverse=True)
+        self.num_strata = int(self.codes.max()) + 1 if len(self.codes) else 0
+
+        permutation = np.random.default_rng(seed).permutation(len(df))
+        # Group the shuffled rows by stratum; the stable sort keeps the shuffle within strata
+        self.order = permutation[np.argsort(self.codes[permutation], kind='stable')]
+
+    def sample(self, mask, fraction):
+        """Return sampled row positions, their strata and per-stratum counts.
+
+        Each stratum contributes ``ceil(fraction * N_h)`` of its filtered rows,
+        at least ``MIN_PER_STRATUM`` (or all of them when it is smaller).
+        """
+        ordered = self.order[mask[self.order]]
+        codes = self.codes[ordered]
+        population = np.bincount(codes, minlength=self.num_strata)
+
+        sample_sizes = np.minimum(population, np.maximum(np.ceil(fraction * population), MIN_PER_STRATUM))
+        starts = np.concatenate([[0], np.cumsum(population)[:-1]])
+        rank_in_stratum = np.arange(len(ordered)) - starts[codes]
+        taken = rank_in_stratum < sample_sizes[codes]
+
+        return ordered[taken], codes[taken], population, sample_sizes.astype(int)
+
+    def summary(self, df, mask, fraction):
+        """Estimate the ``exact_summary`` values from a stratified sample."""
+        positions, strata, population, sample_sizes = self.sample(mask, fraction)
+        sample = df.iloc[positions]
+        estimator = _RatioEstimator(strata, population, sample_sizes)
+        ones = np.ones(len(sample))
+
+        def mean_of(column, within=None):
+            values = sample[column].to_numpy(dtype=float)
+            present = ~np.isnan(values)
+            if within is not None:
+                present &= within
+            return estimator.ratio(np.where(present, values, 0.0), present.astype(float))
+
+        is_explicit = (sample['Track Type'] == 'Explicit').to_numpy()
+        explicit_share = estimator.ratio(is_explicit.astype(float), ones)
+
+        summary = {
+            'exact': False,
+            'fraction': fraction,
+            'sample_size': len(sample),
+            'total_songs': int(population.sum()),
+            'avg_streams': mean_of('Spotify Streams'),
+            'avg_score': mean_of('Track Score'),
+            'explicit_pct': Estimate(explicit_share.value * 100, explicit_share.margin * 100),
+        }
+
+        # Most frequent artist, weighting each sampled row by the rows it stands for
+        if len(sample):
+            weights = pd.Series(estimator.weights, index=sample.index)
+            summary['top_artist'] = weights.groupby(sample['Artist']).sum().idxmax()
+        else:
+            summary['top_artist'] = None
+
+        platform_values = {p: np.nan_to_num(sample[c].to_numpy(dtype=float)) for p, c in PLATFORM_COLUMNS.items()}
+        all_platforms = sum(platform_values.values())
+        summary['platform_totals'] = {p: estimator.total(v) for p, v in platform_values.items()}
+        summary['platform_shares'] = {p: estimator.ratio(v, all_platforms) for p, v in platform_values.items()}
+
+        track_types = sample['Track Type'].to_numpy()
+        summary['explicit_means'] = {
+            track_type: {column: mean_of(column, within=track_types == track_type)
+                         for column in PLATFORM_COLUMNS.values()}
+            for track_type in sorted(set(track_types))
+        }
+        return summary
+
+
+class _RatioEstimator:
+    """Stratified totals and ratios of totals with linearized variances."""
+
+    def __init__(self, strata, population, sample_sizes):
+        self.strata = strata
+        self.population = population.astype(float)
+        self.sample_sizes = sample_sizes.astype(float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            stratum_weights = np.where(sample_sizes > 0, self.population / self.sample_sizes, 0.0)
+            # Finite population correction times N_h^2 / n_h
+            self._variance_factor = np.where(
+                sample_sizes > 1,
+                self.population ** 2 * (1 - self.sample_sizes / np.maximum(self.population, 1)) / self.sample_sizes,
+                0.0
+            )
+        self.weights = stratum_weights[strata]
+
+    def _total_variance(self, values):
+        minlength = len(self.population)
+        sums = np.bincount(self.strata, weights=values, minlength=minlength)
+        squares = np.bincount(self.strata, weights=values ** 2, minlength=minlength)
+        n = self.sample_sizes
+        with np.errstate(divide='ignore', invalid='ignore'):
+            stratum_var = np.where(n > 1, (squares - sums ** 2 / np.maximum(n, 1)) / np.maximum(n - 1, 1), 0.0)
+        return float(np.sum(self._variance_factor * np.maximum(stratum_var, 0.0)))
+
+    def total(self, values):
+        estimate = float(np.sum(self.weights * values))
+        return Estimate(estimate, Z_95 * np.sqrt(self._total_variance(values)))
+
+    def ratio(self, numerator, denominator):
+        total_den = float(np.sum(self.weights * denominator))
+        if total_den == 0:
+            return Estimate(float('nan'), float('nan'))
+        ratio = float(np.sum(self.weights * numerator)) / total_den
+        residuals = numerator - ratio * denominator
+        return Estimate(ratio, Z_95 * np.sqrt(self._total_variance(residuals)) / total_den)
@@ -0,0 +1,132 @@
+"""Release-date rollups at month, quarter and year resolution.
+
+For every resolution the track count and platform totals are binned once
+into a cube over (Track Type, Track Score bin, period), cumulative along
+the score axis. A query combines whole score bins with two lookups per
+Track Type and only visits the rows of the two partially covered edge
+bins, so switching resolution or panning the period window never scans
+the dataset.
+"""
+import numpy as np
+import pandas as pd
+
+RESOLUTIONS = {
+    'Month': 'M',
+    'Quarter': 'Q',
+    'Year': 'Y'
+}
+
+ROLLUP_METRICS = ['Tracks', 'Spotify Streams', 'YouTube Views', 'TikTok Views']
+
+# Track Score bins per cube; with fewer distinct scores each score gets its own bin
+MAX_SCORE_BINS = 256
+
+
+def period_codes(dates, resolution, first_year):
+    """Vectorized period index of each date, counted from January of ``first_year``."""
+    years = dates.dt.year.to_numpy() - first_year
+    if resolution == 'Year':
+        return years
+    if resolution == 'Quarter':
+        return years * 4 + (dates.dt.month.to_numpy() - 1) // 3
+    return years * 12 + dates.dt.month.to_numpy() - 1
+
+
+class ReleaseRollups:
+    """Precomputed release-date rollups filterable by Track Type and Track Score."""
+
+    def __init__(self, df, max_score_bins=MAX_SCORE_BINS):
+        dates = df['Release Date']
+        scores = df['Track Score'].to_numpy(dtype=float)
+        # Rows without a date or score never match the dashboard filters
+        keep = (dates.notna() & ~np.isnan(scores)).to_numpy()
+
+        dates = dates[keep]
+        scores = scores[keep]
+        type_codes, self.track_types = pd.factorize(df['Track Type'][keep])
+        values = np.column_stack([np.ones(len(scores))] + [
+            np.nan_to_num(df[col].to_numpy(dtype=float)[keep]) for col in ROLLUP_METRICS[1:]
+        ])
+
+        self.first_year = int(dates.dt.year.min()) if len(dates) else 2000
+        last_year = int(dates.dt.year.max()) if len(dates) else 2000
+
+        # Score bin edges, closed by +inf; bin i holds scores in [edges[i], edges[i + 1])
+        distinct = np.unique(scores)
+        if len(distinct) > max_score_bins:
+            distinct = np.unique(np.quantile(scores, np.linspace(0, 1, max_score_bins, endpoint=False)))
+        self.edges = np.append(distinct, np.inf)
+        num_bins = len(self.edges) - 1
+        bins = np.searchsorted(self.edges, scores, side='right') - 1
+
+        # Rows sorted by (Track Type, score) for the edge-bin lookups
+        order = np.lexsort((scores, type_codes))
+        self._scores = scores[order]
+        self._values = values[order]
+        self._type_bounds = np.searchsorted(type_codes[order], np.arange(len(self.track_types) + 1))
+
+        self.labels = {}
+        self._cubes = {}
+        self._periods = {}
+        for resolution, freq in RESOLUTIONS.items():
+            periods = period_codes(dates, resolution, self.first_year)
+            num_periods = int(period_codes(pd.Series(pd.to_datetime([f'{last_year}-12-31'])),
+                                           resolution, self.first_year)[0]) + 1
+            self.labels[resolution] = pd.period_range(f'{self.first_year}-01', periods=num_periods, freq=freq)
+
+            flat = (type_codes * num_bins + bins) * num_periods + periods
+            size = len(self.track_types) * num_bins * num_periods
+            cube = np.stack([np.bincount(flat, weights=values[:, m], minlength=size)
+                             for m in range(values.shape[1])], axis=-1)
+            cube = cube.reshape(len(self.track_types), num_bins, num_periods, values.shape[1])
+
+            # Cumulative over score bins, with a leading zero bin
+            cumulative = np.zeros((len(self.track_types), num_bins + 1, num_periods, values.shape[1]))
+            np.cumsum(cube, axis=1, out=cumulative[:, 1:])
+            self._cubes[resolution] = cumulative
+            self._periods[resolution] = periods[order]
+
+    def query(self, resolution, track_types=None, score_range=None, year_range=None):
+        """Rollup for the selected Track Types, Track Score range and release years.
+
+        Returns a frame indexed by period with the track count and the
+        platform totals.
+        """
+        cube = self._cubes[resolution]
+        labels = self.labels[resolution]
+        lo, hi = score_range if score_range else (-np.inf, np.inf)
+
+        # Whole score bins inside [lo, hi]
+        first_bin = np.searchsorted(self.edges, lo, side='left')
+        end_bin = np.searchsorted(self.edges[1:], hi, side='right')
+
+        totals = np.zeros(cube.shape[2:])
+        for code, track_type in enumerate(self.track_types):
+            if track_types and track_type not in track_types:
+                continue
+            start, stop = self._type_bounds[code], self._type_bounds[code + 1]
+            scores = self._scores[start:stop]
+            row_lo = start + np.searchsorted(scores, lo, side='left')
+            row_hi = start + np.searchsorted(scores, hi, side='right')
+
+            if first_bin < end_bin:
+                totals += cube[code, end_bin] - cube[code, first_bin]
+                inner_lo = start + np.searchsorted(scores, self.edges[first_bin], side='left')
+                inner_hi = start + np.searchsorted(scores, self.edges[end_bin], side='left')
+                edge_rows = np.r_[row_lo:inner_lo, inner_hi:row_hi]
+            else:
+                edge_rows = np.arange(row_lo, row_hi)
+
+            # Partially covered edge bins: add their matching rows directly
+            if len(edge_rows):
+                periods = self._periods[resolution][edge_rows]
+                for m in range(totals.shape[1]):
+                    totals[:, m] += np.bincount(periods, weights=self._values[edge_rows, m],
+                                                minlength=totals.shape[0])
+
+        rollup = pd.DataFrame(totals, index=labels, columns=ROLLUP_METRICS)
+        rollup['Tracks'] = rollup['Tracks'].astype(int)
+
+        if year_range:
+            rollup = rollup[(labels.year >= year_range[0]) & (labels.year <= year_range[1])]
+        return rollup
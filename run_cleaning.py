@@ -1,115 +1,46 @@
-import pandas as pd
+"""Data cleaning pipeline for the Most Streamed Spotify Songs 2024 dataset.
+
+The eight cleaning steps run as named stages with declared inputs and
+outputs. Each stage output is cached under ``.pipeline_cache/`` by a key
+built from the hash of the raw CSV, the stage parameters, the stage code
+and the keys of its inputs, so a rerun only recomputes stages whose
+inputs actually changed.
+
+Usage:
+    python run_cleaning.py                          # run all stages
+    python run_cleaning.py --quiet                  # skip inspection output
+    python run_cleaning.py --stages drop_columns export
+    python run_cleaning.py --force                  # ignore cached outputs
+    python run_cleaning.py --list                   # show the stages
+    python run_cleaning.py --force --profile        # write a per-stage profile report
+    python run_cleaning.py --force --profile --compare previous_profile.json
+"""
+import argparse
+import glob
+import hashlib
+import inspect
+import json
+import os
+import platform
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
+import pandas as pd
+import pyarrow as pa
 
-# Set display options
-pd.set_option('display.max_columns', None)
-pd.set_option('display.max_rows', 100)
+RAW_PATH = 'Most Streamed Spotify Songs 2024.csv'
+CLEANED_PATH = 'Most Streamed Spotify Songs 2024_cleaned.csv'
+CACHE_DIR = '.pipeline_cache'
+PROFILE_PATH = 'cleaning_profile.json'
 
-print("="*70)
-print("DATA CLEANING - Most Streamed Spotify Songs 2024")
-print("="*70)
-
-# 1. Load and Inspect Data
-print("\n" + "="*70)
-print("STEP 1: LOAD AND INSPECT DATA")
-print("="*70)
-
-df = pd.read_csv('Most Streamed Spotify Songs 2024.csv', encoding='latin-1')
-
-print(f"\nDataset Shape: {df.shape}")
-print(f"Total Rows: {df.shape[0]}")
-print(f"Total Columns: {df.shape[1]}")
-
-print("\nFirst 5 rows:")
-print(df.head())
-
-print("\n\nColumn Names and Data Types:")
-print(df.info())
-
-print("\n\nStatistical Summary:")
-print(df.describe())
-
-# 2. Check for Null/Missing Values
-print("\n\n" + "="*70)
-print("STEP 2: CHECK FOR NULL/MISSING VALUES")
-print("="*70)
-
-null_counts = df.isnull().sum()
-null_percentages = (df.isnull().sum() / len(df)) * 100
-
-missing_data = pd.DataFrame({
-    'Column': null_counts.index,
-    'Null Count': null_counts.values,
-    'Null Percentage': null_percentages.values
-})
-
-missing_data = missing_data[missing_data['Null Count'] > 0].sort_values('Null Count', ascending=False)
-
-if len(missing_data) > 0:
-    print(f"\nFound {len(missing_data)} columns with missing values:")
-    print(missing_data.to_string(index=False))
-else:
-    print("\nNo missing values found!")
-
-# 3. Check for Duplicate Rows
-print("\n\n" + "="*70)
-print("STEP 3: CHECK FOR DUPLICATE ROWS")
-print("="*70)
-
-duplicate_count = df.duplicated().sum()
-
-print(f"\nNumber of duplicate rows: {duplicate_count}")
-print(f"Percentage of duplicates: {(duplicate_count/len(df))*100:.2f}%")
-
-if duplicate_count > 0:
-    print("\nDuplicate rows found:")
-    duplicates_df = df[df.duplicated(keep=False)].sort_values(by='Track')
-    print(duplicates_df[['Track', 'Artist', 'Album Name']].head(20))
-
-    df_cleaned = df.drop_duplicates()
-    print(f"\nRows after removing duplicates: {len(df_cleaned)}")
-else:
-    df_cleaned = df.copy()
-    print("\nNo duplicate rows found!")
-
-# 4. Handle Encoding Issues
-print("\n\n" + "="*70)
-print("STEP 4: CHECK FOR ENCODING ISSUES")
-print("="*70)
-
-text_columns = df_cleaned.select_dtypes(include=['object']).columns
-encoding_issues = {}
-
-for col in text_columns:
-    issue_mask = df_cleaned[col].astype(str).str.contains('�|\\ufffd', regex=True, na=False)
-    if issue_mask.any():
-        encoding_issues[col] = {
-            'count': issue_mask.sum(),
-            'examples': df_cleaned[issue_mask][col].unique()[:5]
-        }
-
-if encoding_issues:
-    print("\nColumns with encoding issues:")
-    for col, data in encoding_issues.items():
-        print(f"\n{col}: {data['count']} rows affected")
-        print("Examples:")
-        for example in data['examples']:
-            print(f"  - {example}")
-else:
-    print("\nNo encoding issues detected!")
-
-total_encoding_issues = sum(df_cleaned[col].astype(str).str.contains('�|\\ufffd', regex=True, na=False).sum()
-                           for col in text_columns)
-print(f"\nTotal rows with encoding issues: {total_encoding_issues}")
-
-# 5. Check and Convert Data Types
-print("\n\n" + "="*70)
-print("STEP 5: CHECK AND CONVERT DATA TYPES")
-print("="*70)
-
-numeric_cols = ['Spotify Streams', 'Spotify Playlist Count', 'Spotify Playlist Reach',
+# A step is flagged when it grows past the relative threshold and these absolute floors
+REGRESSION_THRESHOLD = 0.25
+MIN_SECONDS_DELTA = 0.05
+MIN_MEMORY_DELTA_MB = 1.0
+
+NUMERIC_COLS = ['Spotify Streams', 'Spotify Playlist Count', 'Spotify Playlist Reach',
                 'Spotify Popularity', 'YouTube Views', 'YouTube Likes', 'TikTok Posts',
                 'TikTok Likes', 'TikTok Views', 'YouTube Playlist Reach',
                 'Apple Music Playlist Count', 'AirPlay Spins', 'SiriusXM Spins',
@@ -117,112 +48,556 @@ numeric_cols = ['Spotify Streams', 'Spotify Playlist Count', 'Spotify Playlist R
                 'Pandora Streams', 'Pandora Track Stations', 'Soundcloud Streams',
                 'Shazam Counts', 'TIDAL Popularity']
 
-print("\nConverting numeric columns (removing commas):")
-conversion_summary = []
-for col in numeric_cols:
-    if col in df_cleaned.columns:
-        original_dtype = df_cleaned[col].dtype
-        df_cleaned[col] = pd.to_numeric(df_cleaned[col].astype(str).str.replace(',', ''), errors='coerce')
-        conversion_summary.append(f"{col}: {original_dtype} -> {df_cleaned[col].dtype}")
-
-for item in conversion_summary:
-    print(f"  {item}")
-
-# 6. Handle Outliers and Invalid Values
-print("\n\n" + "="*70)
-print("STEP 6: CHECK FOR INVALID VALUES AND OUTLIERS")
-print("="*70)
-
-numeric_columns = df_cleaned.select_dtypes(include=[np.number]).columns
-negative_values = {}
-
-for col in numeric_columns:
-    neg_count = (df_cleaned[col] < 0).sum()
-    if neg_count > 0:
-        negative_values[col] = neg_count
-
-if negative_values:
-    print("\nColumns with negative values:")
-    for col, count in negative_values.items():
-        print(f"  {col}: {count} negative values")
-else:
-    print("\nNo negative values found!")
-
-print("\n\nOutlier Detection (using IQR method):")
-print("-" * 70)
-
-key_columns = ['Spotify Streams', 'YouTube Views', 'TikTok Views']
-
-for col in key_columns:
-    if col in df_cleaned.columns and df_cleaned[col].notna().any():
-        Q1 = df_cleaned[col].quantile(0.25)
-        Q3 = df_cleaned[col].quantile(0.75)
-        IQR = Q3 - Q1
-        lower_bound = Q1 - 1.5 * IQR
-        upper_bound = Q3 + 1.5 * IQR
-
-        outliers = df_cleaned[(df_cleaned[col] < lower_bound) | (df_cleaned[col] > upper_bound)]
-
-        print(f"\n{col}:")
-        print(f"  Q1: {Q1:,.0f}")
-        print(f"  Q3: {Q3:,.0f}")
-        print(f"  IQR: {IQR:,.0f}")
-        print(f"  Lower bound: {lower_bound:,.0f}")
-        print(f"  Upper bound: {upper_bound:,.0f}")
-        print(f"  Number of outliers: {len(outliers)} ({len(outliers)/len(df_cleaned)*100:.1f}%)")
-
-# 7. Drop Unnecessary Columns
-print("\n\n" + "="*70)
-print("STEP 7: DROP UNNECESSARY COLUMNS")
-print("="*70)
-
-columns_to_drop = ['ISRC', 'TIDAL Popularity', 'Soundcloud Streams', 'SiriusXM Spins', 'Pandora Track Stations']
-
-print(f"\nColumns to drop: {columns_to_drop}")
-print(f"Shape before dropping columns: {df_cleaned.shape}")
-
-# Drop columns that exist in the dataframe
-existing_columns_to_drop = [col for col in columns_to_drop if col in df_cleaned.columns]
-missing_columns = [col for col in columns_to_drop if col not in df_cleaned.columns]
-
-if existing_columns_to_drop:
-    df_cleaned = df_cleaned.drop(columns=existing_columns_to_drop)
-    print(f"\nDropped columns: {existing_columns_to_drop}")
-else:
-    print("\nNo columns to drop (none found in dataset)")
-
-if missing_columns:
-    print(f"Columns not found in dataset: {missing_columns}")
-
-print(f"Shape after dropping columns: {df_cleaned.shape}")
-
-# 8. Final Summary
-print("\n\n" + "="*70)
-print("STEP 8: FINAL CLEANED DATA SUMMARY")
-print("="*70)
-
-print(f"\nOriginal dataset shape: {df.shape}")
-print(f"Cleaned dataset shape: {df_cleaned.shape}")
-print(f"Rows removed: {len(df) - len(df_cleaned)}")
-print(f"Columns: {df_cleaned.shape[1]}")
-print(f"Memory usage: {df_cleaned.memory_usage(deep=True).sum() / 1024**2:.2f} MB")
-
-print("\n\nRemaining Missing Values:")
-print("-" * 70)
-remaining_nulls = df_cleaned.isnull().sum()
-remaining_nulls = remaining_nulls[remaining_nulls > 0].sort_values(ascending=False)
-if len(remaining_nulls) > 0:
-    for col, count in remaining_nulls.items():
-        print(f"{col}: {count} ({(count/len(df_cleaned))*100:.2f}%)")
-else:
-    print("No missing values!")
-
-print("\n\nCleaned Data Sample (first 10 rows):")
-print("-" * 70)
-print(df_cleaned.head(10)[['Track', 'Artist', 'Spotify Streams', 'YouTube Views', 'TikTok Views']])
-
-# Save cleaned data
-df_cleaned.to_csv('Most Streamed Spotify Songs 2024_cleaned.csv', index=False)
-print("\n\n" + "="*70)
-print("Cleaned data saved to 'Most Streamed Spotify Songs 2024_cleaned.csv'")
-print("="*70)
+OUTLIER_COLUMNS = ['Spotify Streams', 'YouTube Views', 'TikTok Views']
+
+COLUMNS_TO_DROP = ['ISRC', 'TIDAL Popularity', 'Soundcloud Streams', 'SiriusXM Spins', 'Pandora Track Stations']
+
+# Set display options
+pd.set_option('display.max_columns', None)
+pd.set_option('display.max_rows', 100)
+
+
+def print_header(title):
+    print("\n\n" + "="*70)
+    print(title)
+    print("="*70)
+
+
+# ---------------------------------------------------------------------------
+# Stage registry
+# ---------------------------------------------------------------------------
+
+class Stage:
+    """A named pipeline step with declared input and output artifacts."""
+
+    def __init__(self, name, step, func, inputs=(), output=None, params=None, inspection=False):
+        self.name = name
+        self.step = step
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.output = output
+        self.params = params or {}
+        self.inspection = inspection
+
+    def code_hash(self):
+        return hashlib.sha256(inspect.getsource(self.func).encode('utf-8')).hexdigest()
+
+
+STAGES = []
+
+
+def stage(name, step, inputs=(), output=None, params=None, inspection=False):
+    """Register the decorated function as pipeline stage ``name``.
+
+    Inspection stages only report on their inputs and are skipped in
+    ``--quiet`` mode.
+    """
+    def register(func):
+        STAGES.append(Stage(name, step, func, inputs, output, params, inspection))
+        return func
+    return register
+
+
+# ---------------------------------------------------------------------------
+# Stages
+# ---------------------------------------------------------------------------
+
+@stage('load', 1, output='raw', params={'path': RAW_PATH, 'encoding': 'latin-1'})
+def load(path, encoding, verbose):
+    df = pd.read_csv(path, encoding=encoding)
+
+    if verbose:
+        print(f"\nDataset Shape: {df.shape}")
+        print(f"Total Rows: {df.shape[0]}")
+        print(f"Total Columns: {df.shape[1]}")
+
+        print("\nFirst 5 rows:")
+        print(df.head())
+
+        print("\n\nColumn Names and Data Types:")
+        print(df.info())
+
+        print("\n\nStatistical Summary:")
+        print(df.describe())
+
+    return df
+
+
+@stage('missing_values', 2, inputs=['raw'], inspection=True)
+def missing_values(raw, verbose):
+    null_counts = raw.isnull().sum()
+    null_percentages = (raw.isnull().sum() / len(raw)) * 100
+
+    missing_data = pd.DataFrame({
+        'Column': null_counts.index,
+        'Null Count': null_counts.values,
+        'Null Percentage': null_percentages.values
+    })
+
+    missing_data = missing_data[missing_data['Null Count'] > 0].sort_values('Null Count', ascending=False)
+
+    if len(missing_data) > 0:
+        print(f"\nFound {len(missing_data)} columns with missing values:")
+        print(missing_data.to_string(index=False))
+    else:
+        print("\nNo missing values found!")
+
+
+@stage('duplicates', 3, inputs=['raw'], output='deduplicated')
+def duplicates(raw, verbose):
+    duplicate_mask = raw.duplicated()
+    duplicate_count = duplicate_mask.sum()
+
+    if verbose:
+        print(f"\nNumber of duplicate rows: {duplicate_count}")
+        print(f"Percentage of duplicates: {(duplicate_count/len(raw))*100:.2f}%")
+
+    if duplicate_count > 0:
+        df_cleaned = raw[~duplicate_mask]
+        if verbose:
+            print("\nDuplicate rows found:")
+            duplicates_df = raw[raw.duplicated(keep=False)].sort_values(by='Track')
+            print(duplicates_df[['Track', 'Artist', 'Album Name']].head(20))
+            print(f"\nRows after removing duplicates: {len(df_cleaned)}")
+    else:
+        df_cleaned = raw.copy()
+        if verbose:
+            print("\nNo duplicate rows found!")
+
+    return df_cleaned
+
+
+@stage('encoding', 4, inputs=['deduplicated'], inspection=True)
+def encoding(deduplicated, verbose):
+    text_columns = deduplicated.select_dtypes(include=['object', 'string']).columns
+    encoding_issues = {}
+    total_encoding_issues = 0
+
+    for col in text_columns:
+        issue_mask = deduplicated[col].astype(str).str.contains('\ufffd', regex=False, na=False)
+        total_encoding_issues += issue_mask.sum()
+        if issue_mask.any():
+            encoding_issues[col] = {
+                'count': issue_mask.sum(),
+                'examples': deduplicated[issue_mask][col].unique()[:5]
+            }
+
+    if encoding_issues:
+        print("\nColumns with encoding issues:")
+        for col, data in encoding_issues.items():
+            print(f"\n{col}: {data['count']} rows affected")
+            print("Examples:")
+            for example in data['examples']:
+                print(f"  - {example}")
+    else:
+        print("\nNo encoding issues detected!")
+
+    print(f"\nTotal rows with encoding issues: {total_encoding_issues}")
+
+
+@stage('convert_types', 5, inputs=['deduplicated'], output='typed', params={'numeric_cols': NUMERIC_COLS})
+def convert_types(deduplicated, numeric_cols, verbose):
+    df_cleaned = deduplicated.copy()
+
+    conversion_summary = []
+    for col in numeric_cols:
+        if col in df_cleaned.columns:
+            original_dtype = df_cleaned[col].dtype
+            df_cleaned[col] = pd.to_numeric(df_cleaned[col].astype(str).str.replace(',', ''), errors='coerce')
+            conversion_summary.append(f"{col}: {original_dtype} -> {df_cleaned[col].dtype}")
+
+    if verbose:
+        print("\nConverting numeric columns (removing commas):")
+        for item in conversion_summary:
+            print(f"  {item}")
+
+    return df_cleaned
+
+
+@stage('outliers', 6, inputs=['typed'], params={'key_columns': OUTLIER_COLUMNS}, inspection=True)
+def outliers(typed, key_columns, verbose):
+    numeric_columns = typed.select_dtypes(include=[np.number]).columns
+    negative_values = {}
+
+    for col in numeric_columns:
+        neg_count = (typed[col] < 0).sum()
+        if neg_count > 0:
+            negative_values[col] = neg_count
+
+    if negative_values:
+        print("\nColumns with negative values:")
+        for col, count in negative_values.items():
+            print(f"  {col}: {count} negative values")
+    else:
+        print("\nNo negative values found!")
+
+    print("\n\nOutlier Detection (using IQR method):")
+    print("-" * 70)
+
+    for col in key_columns:
+        if col in typed.columns and typed[col].notna().any():
+            Q1 = typed[col].quantile(0.25)
+            Q3 = typed[col].quantile(0.75)
+            IQR = Q3 - Q1
+            lower_bound = Q1 - 1.5 * IQR
+            upper_bound = Q3 + 1.5 * IQR
+
+            outlier_rows = typed[(typed[col] < lower_bound) | (typed[col] > upper_bound)]
+
+            print(f"\n{col}:")
+            print(f"  Q1: {Q1:,.0f}")
+            print(f"  Q3: {Q3:,.0f}")
+            print(f"  IQR: {IQR:,.0f}")
+            print(f"  Lower bound: {lower_bound:,.0f}")
+            print(f"  Upper bound: {upper_bound:,.0f}")
+            print(f"  Number of outliers: {len(outlier_rows)} ({len(outlier_rows)/len(typed)*100:.1f}%)")
+
+
+@stage('drop_columns', 7, inputs=['typed'], output='cleaned', params={'columns_to_drop': COLUMNS_TO_DROP})
+def drop_columns(typed, columns_to_drop, verbose):
+    # Drop columns that exist in the dataframe
+    existing_columns_to_drop = [col for col in columns_to_drop if col in typed.columns]
+    missing_columns = [col for col in columns_to_drop if col not in typed.columns]
+
+    df_cleaned = typed.drop(columns=existing_columns_to_drop)
+
+    if verbose:
+        print(f"\nColumns to drop: {columns_to_drop}")
+        print(f"Shape before dropping columns: {typed.shape}")
+        if existing_columns_to_drop:
+            print(f"\nDropped columns: {existing_columns_to_drop}")
+        else:
+            print("\nNo columns to drop (none found in dataset)")
+        if missing_columns:
+            print(f"Columns not found in dataset: {missing_columns}")
+        print(f"Shape after dropping columns: {df_cleaned.shape}")
+
+    return df_cleaned
+
+
+@stage('export', 8, inputs=['raw', 'cleaned'], params={'path': CLEANED_PATH})
+def export(raw, cleaned, path, verbose):
+    if verbose:
+        print(f"\nOriginal dataset shape: {raw.shape}")
+        print(f"Cleaned dataset shape: {cleaned.shape}")
+        print(f"Rows removed: {len(raw) - len(cleaned)}")
+        print(f"Columns: {cleaned.shape[1]}")
+        print(f"Memory usage: {cleaned.memory_usage(deep=True).sum() / 1024**2:.2f} MB")
+
+        print("\n\nRemaining Missing Values:")
+        print("-" * 70)
+        remaining_nulls = cleaned.isnull().sum()
+        remaining_nulls = remaining_nulls[remaining_nulls > 0].sort_values(ascending=False)
+        if len(remaining_nulls) > 0:
+            for col, count in remaining_nulls.items():
+                print(f"{col}: {count} ({(count/len(cleaned))*100:.2f}%)")
+        else:
+            print("No missing values!")
+
+        print("\n\nCleaned Data Sample (first 10 rows):")
+        print("-" * 70)
+        print(cleaned.head(10)[['Track', 'Artist', 'Spotify Streams', 'YouTube Views', 'TikTok Views']])
+
+    # Save cleaned data
+    cleaned.to_csv(path, index=False)
+    print(f"\nCleaned data saved to '{path}'")
+
+
+STAGE_TITLES = {
+    'load': "STEP 1: LOAD AND INSPECT DATA",
+    'missing_values': "STEP 2: CHECK FOR NULL/MISSING VALUES",
+    'duplicates': "STEP 3: CHECK FOR DUPLICATE ROWS",
+    'encoding': "STEP 4: CHECK FOR ENCODING ISSUES",
+    'convert_types': "STEP 5: CHECK AND CONVERT DATA TYPES",
+    'outliers': "STEP 6: CHECK FOR INVALID VALUES AND OUTLIERS",
+    'drop_columns': "STEP 7: DROP UNNECESSARY COLUMNS",
+    'export': "STEP 8: FINAL CLEANED DATA SUMMARY",
+}
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def profile_call(func, kwargs):
+    """Call ``func`` and measure wall-clock time, CPU time and memory.
+
+    Requires tracemalloc to be tracing; the peak is relative to the memory
+    already allocated when the call starts. tracemalloc does not see
+    Arrow's allocator, which holds pandas string columns, so the change in
+    Arrow-allocated memory over the call is recorded alongside it.
+    """
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    arrow_baseline = pa.total_allocated_bytes()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+
+    result = func(**kwargs)
+
+    wall_seconds = time.perf_counter() - wall_start
+    cpu_seconds = time.process_time() - cpu_start
+    _, peak = tracemalloc.get_traced_memory()
+    arrow_change = pa.total_allocated_bytes() - arrow_baseline
+    return result, {
+        'wall_seconds': round(wall_seconds, 4),
+        'cpu_seconds': round(cpu_seconds, 4),
+        'peak_memory_mb': round((peak - baseline) / 1024**2, 3),
+        'arrow_memory_mb': round(arrow_change / 1024**2, 3),
+    }
+
+
+class Pipeline:
+    """Runs stages in order, reusing cached outputs whose key is unchanged."""
+
+    def __init__(self, stages, cache_dir=CACHE_DIR, verbose=True, force=False, profile=False):
+        self.stages = {s.name: s for s in stages}
+        self.producers = {s.output: s for s in stages if s.output}
+        self.cache_dir = cache_dir
+        self.verbose = verbose
+        self.force = force
+        self.profile = profile
+        self.records = {}
+        self._keys = {}
+        self._artifacts = {}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def stage_key(self, stage):
+        """Content address of a stage: its code, parameters and input keys."""
+        if stage.name not in self._keys:
+            payload = {
+                'stage': stage.name,
+                'code': stage.code_hash(),
+                'params': stage.params,
+                'inputs': [self.stage_key(self.producers[name]) for name in stage.inputs],
+            }
+            if not stage.inputs and 'path' in stage.params:
+                payload['source'] = file_hash(stage.params['path'])
+            encoded = json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+            self._keys[stage.name] = hashlib.sha256(encoded).hexdigest()
+        return self._keys[stage.name]
+
+    def _cache_path(self, stage):
+        return os.path.join(self.cache_dir, f"{stage.name}-{self.stage_key(stage)[:16]}.pkl")
+
+    def _marker_path(self, stage):
+        return os.path.join(self.cache_dir, f"{stage.name}-{self.stage_key(stage)[:16]}.done")
+
+    def is_cached(self, stage):
+        if self.force:
+            return False
+        if stage.output:
+            return os.path.exists(self._cache_path(stage))
+        # Side-effect stages record the hash of the file they wrote; it must be untouched
+        marker, path = self._marker_path(stage), stage.params.get('path', '')
+        if not (os.path.exists(marker) and os.path.exists(path)):
+            return False
+        with open(marker) as f:
+            return f.read().strip() == file_hash(path)
+
+    def _store(self, stage, result):
+        for stale in glob.glob(os.path.join(self.cache_dir, f"{stage.name}-*")):
+            os.remove(stale)
+        if stage.output:
+            result.to_pickle(self._cache_path(stage))
+        else:
+            with open(self._marker_path(stage), 'w') as f:
+                f.write(file_hash(stage.params['path']))
+
+    def artifact(self, name):
+        """Return artifact ``name``, from memory, the cache, or by running its producer."""
+        if name not in self._artifacts:
+            producer = self.producers[name]
+            if self.is_cached(producer):
+                self._artifacts[name] = pd.read_pickle(self._cache_path(producer))
+            else:
+                self.execute(producer, verbose=False)
+        return self._artifacts[name]
+
+    def _record(self, stage, status, **fields):
+        self.records[stage.name] = {'step': stage.step, 'name': stage.name, 'status': status, **fields}
+
+    def execute(self, stage, verbose):
+        inputs = {name: self.artifact(name) for name in stage.inputs}
+        kwargs = {**inputs, **stage.params, 'verbose': verbose}
+        if self.profile:
+            result, metrics = profile_call(stage.func, kwargs)
+            # The last declared input is the frame the stage works on
+            rows_in = len(inputs[stage.inputs[-1]]) if stage.inputs else None
+            rows_out = len(result) if isinstance(result, pd.DataFrame) else rows_in
+            self._record(stage, 'ran', rows_in=rows_in, rows_out=rows_out, **metrics)
+        else:
+            result = stage.func(**kwargs)
+        if stage.output:
+            self._artifacts[stage.output] = result
+        if not stage.inspection:
+            self._store(stage, result)
+        return result
+
+    def run(self, names):
+        for name in names:
+            stage = self.stages[name]
+
+            if stage.inspection and not self.verbose:
+                print(f"[{stage.step}] {stage.name}: skipped (quiet)")
+                self._record(stage, 'skipped')
+                continue
+            if not stage.inspection and self.is_cached(stage):
+                print(f"[{stage.step}] {stage.name}: unchanged, using cache")
+                self._record(stage, 'cached')
+                continue
+
+            if self.verbose:
+                print_header(STAGE_TITLES[stage.name])
+            self.execute(stage, verbose=self.verbose)
+            if not self.verbose:
+                print(f"[{stage.step}] {stage.name}: done")
+
+
+def build_report(pipeline):
+    """Collect the pipeline's stage records into a JSON-serializable report."""
+    stages = sorted(pipeline.records.values(), key=lambda record: record['step'])
+    return {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'source': RAW_PATH,
+        'source_sha256': file_hash(RAW_PATH),
+        'total_wall_seconds': round(sum(r.get('wall_seconds', 0) for r in stages), 4),
+        'stages': stages,
+    }
+
+
+def compare_reports(current, previous, threshold=REGRESSION_THRESHOLD):
+    """List steps whose time or memory grew by more than ``threshold``.
+
+    Only steps that actually ran in both reports are compared, and only on
+    metrics both reports recorded.
+    """
+    previous_stages = {r['name']: r for r in previous.get('stages', []) if r['status'] == 'ran'}
+    regressions = []
+    for record in current['stages']:
+        before = previous_stages.get(record['name'])
+        if record['status'] != 'ran' or before is None:
+            continue
+        for metric, floor in [('wall_seconds', MIN_SECONDS_DELTA),
+                              ('cpu_seconds', MIN_SECONDS_DELTA),
+                              ('peak_memory_mb', MIN_MEMORY_DELTA_MB),
+                              ('arrow_memory_mb', MIN_MEMORY_DELTA_MB)]:
+            old, new = before.get(metric), record.get(metric)
+            if old is None or new is None:
+                continue
+            if new - old > floor and new > old * (1 + threshold):
+                regressions.append({
+                    'name': record['name'],
+                    'metric': metric,
+                    'previous': old,
+                    'current': new,
+                    'change_pct': round((new / old - 1) * 100, 1) if old else None,
+                })
+    return regressions
+
+
+def print_report(report):
+    print_header("PROFILE")
+    print(f"\n{'Step':<20}{'Status':<9}{'Wall (s)':>10}{'CPU (s)':>10}{'Peak (MB)':>11}{'Arrow (MB)':>12}"
+          f"{'Rows in':>10}{'Rows out':>10}")
+    print("-" * 92)
+    for r in report['stages']:
+        def fmt(key, spec):
+            return format(r[key], spec) if r.get(key) is not None else '-'
+        print(f"{str(r['step']) + '. ' + r['name']:<20}{r['status']:<9}{fmt('wall_seconds', '.3f'):>10}"
+              f"{fmt('cpu_seconds', '.3f'):>10}{fmt('peak_memory_mb', '.2f'):>11}{fmt('arrow_memory_mb', '.2f'):>12}"
+              f"{fmt('rows_in', ','):>10}{fmt('rows_out', ','):>10}")
+
+    if 'regressions' in report:
+        print(f"\nCompared with {report['compared_with']} (threshold {report['threshold']:.0%}):")
+        if report['regressions']:
+            for reg in report['regressions']:
+                change = f"+{reg['change_pct']}%" if reg['change_pct'] is not None else 'new'
+                print(f"  REGRESSION {reg['name']}: {reg['metric']} {reg['previous']} -> {reg['current']} ({change})")
+        else:
+            print("  No regressions.")
+
+
+def resolve_stages(selection):
+    """Map stage names or step numbers to stage names in pipeline order."""
+    if not selection:
+        return [s.name for s in STAGES]
+
+    by_step = {str(s.step): s.name for s in STAGES}
+    names = {s.name for s in STAGES}
+    selected = set()
+    for item in selection:
+        name = by_step.get(item, item)
+        if name not in names:
+            raise SystemExit(f"Unknown stage '{item}'. Use --list to see the available stages.")
+        selected.add(name)
+    return [s.name for s in STAGES if s.name in selected]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Clean the Most Streamed Spotify Songs 2024 dataset.")
+    parser.add_argument('--stages', nargs='+', metavar='STAGE',
+                        help="Stage names or step numbers to run (default: all). "
+                             "Upstream outputs are loaded from the cache or computed as needed.")
+    parser.add_argument('--quiet', action='store_true',
+                        help="Skip inspection stages and per-step reporting")
+    parser.add_argument('--force', action='store_true',
+                        help="Recompute stages even when a cached output exists")
+    parser.add_argument('--cache-dir', default=CACHE_DIR,
+                        help=f"Directory for cached stage outputs (default: {CACHE_DIR})")
+    parser.add_argument('--list', action='store_true', help="List the stages and exit")
+    parser.add_argument('--profile', nargs='?', const=PROFILE_PATH, metavar='PATH',
+                        help=f"Time and memory-profile each stage and write a JSON report (default: {PROFILE_PATH}). "
+                             "Combine with --force to profile every step instead of cache hits.")
+    parser.add_argument('--compare', metavar='PREVIOUS',
+                        help="Flag steps that got slower or more memory-hungry than in a previous report")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help=f"Relative growth that counts as a regression (default: {REGRESSION_THRESHOLD})")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for s in STAGES:
+            kind = 'inspection' if s.inspection else f"-> {s.output or s.params.get('path')}"
+            print(f"{s.step}. {s.name:<15} inputs: {', '.join(s.inputs) or '-':<20} {kind}")
+        return
+
+    print("="*70)
+    print("DATA CLEANING - Most Streamed Spotify Songs 2024")
+    print("="*70)
+
+    if args.compare and not args.profile:
+        parser.error("--compare requires --profile")
+
+    pipeline = Pipeline(STAGES, cache_dir=args.cache_dir, verbose=not args.quiet,
+                        force=args.force, profile=bool(args.profile))
+    if args.profile:
+        tracemalloc.start()
+    pipeline.run(resolve_stages(args.stages))
+
+    if args.profile:
+        tracemalloc.stop()
+        report = build_report(pipeline)
+        if args.compare:
+            with open(args.compare) as f:
+                previous = json.load(f)
+            report['compared_with'] = args.compare
+            report['threshold'] = args.threshold
+            report['regressions'] = compare_reports(report, previous, args.threshold)
+
+        with open(args.profile, 'w') as f:
+            json.dump(report, f, indent=2)
+        print_report(report)
+        print(f"\nProfile written to '{args.profile}'")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Nearest-neighbour search over cross-platform engagement profiles.
+
+Each track is described by log-scaled, standardized platform metrics;
+missing metrics are imputed at the column mean (zero after scaling).
+The vectors are indexed once in a KD-tree, and queries widen the tree
+search until enough neighbours pass the sidebar filter, switching to a
+vectorized scan of the filtered rows when the filter is very selective.
+"""
+import numpy as np
+from scipy.spatial import cKDTree
+
+PROFILE_COLUMNS = ['Spotify Streams', 'Spotify Playlist Count', 'Spotify Playlist Reach',
+                   'YouTube Views', 'YouTube Likes', 'TikTok Posts', 'TikTok Likes', 'TikTok Views',
+                   'Shazam Counts', 'Apple Music Playlist Count', 'Deezer Playlist Reach',
+                   'Amazon Playlist Count']
+
+# Scan the filtered rows directly when the filter keeps at most this many
+BRUTE_FORCE_ROWS = 20_000
+
+
+class SimilarityIndex:
+    """KD-tree over engagement profile vectors of every track in ``df``."""
+
+    def __init__(self, df, columns=PROFILE_COLUMNS):
+        self.columns = [col for col in columns if col in df.columns]
+        values = df[self.columns].to_numpy(dtype=float)
+        logged = np.log1p(np.clip(values, 0, None))
+
+        mean = np.nanmean(logged, axis=0)
+        std = np.nanstd(logged, axis=0)
+        std[~(std > 0)] = 1.0
+        self.vectors = np.nan_to_num((logged - mean) / std, nan=0.0)
+        self.tree = cKDTree(self.vectors)
+
+    def query(self, position, k=10, mask=None):
+        """Return positions and distances of the ``k`` tracks closest to ``position``.
+
+        The track itself is excluded, and only rows where ``mask`` is True
+        are returned.
+        """
+        point = self.vectors[position]
+        allowed = np.ones(len(self.vectors), dtype=bool) if mask is None else mask.copy()
+        allowed[position] = False
+        num_allowed = int(allowed.sum())
+        k = min(k, num_allowed)
+        if k == 0:
+            return np.array([], dtype=int), np.array([])
+
+        if num_allowed <= BRUTE_FORCE_ROWS:
+            return self._scan(point, np.flatnonzero(allowed), k)
+
+        # Widen the tree search until enough neighbours fall inside the filter
+        probe = k + 1
+        while True:
+            probe = min(probe * 4, len(self.vectors))
+            distances, positions = self.tree.query(point, k=probe)
+            keep = allowed[positions]
+            if keep.sum() >= k or probe == len(self.vectors):
+                return positions[keep][:k], distances[keep][:k]
+            if probe >= 4 * BRUTE_FORCE_ROWS:
+                return self._scan(point, np.flatnonzero(allowed), k)
+
+    def _scan(self, point, candidates, k):
+        distances = np.sqrt(((self.vectors[candidates] - point) ** 2).sum(axis=1))
+        nearest = np.argpartition(distances, k - 1)[:k] if k < len(candidates) else np.arange(len(candidates))
+        nearest = nearest[np.argsort(distances[nearest], kind='stable')]
+        return candidates[nearest], distances[nearest]
@@ -0,0 +1,333 @@
+"""Prerendered static snapshots of the dashboard for a fixed grid of filters.
+
+Every combination of the configured Track Type selections, release year
+ranges and track score ranges is rendered without a Streamlit server,
+using the dashboard's own loading, filtering, summary and figure code.
+Each grid cell becomes a standalone HTML page and a JSON bundle with the
+key metrics, the Q1-Q4 data and the four figure specs, so preset views
+can be served as static files. Cells are rendered in parallel in a
+process pool, and only cells whose fingerprint (the filtered rows, the
+filters and the rendering code) changed since the last run are redone.
+
+Usage:
+    python snapshots.py                             # render the default grid into snapshots/
+    python snapshots.py --grid grid.json --out public/snapshots
+    python snapshots.py --list                      # show the grid cells
+    python snapshots.py --force --workers 4         # re-render every cell
+"""
+import argparse
+import hashlib
+import html
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import plotly
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+
+import dataset
+import figures
+import metrics
+from dataset import DATA_PATH, build_filter_mask, load_dataset
+from figures import (data_fingerprint, explicit_comparison_figure, platform_share_figure,
+                     playlist_influence_figure, rank_trends_figure)
+from metrics import exact_summary, explicit_comparison_frame, platform_totals_frame, top_ranked
+
+OUTPUT_DIR = 'snapshots'
+MANIFEST_NAME = 'manifest.json'
+PLOTLY_JS_NAME = 'plotly.min.js'
+
+# Filter grid; a null range or bound means the full extent of the data, as the sliders default to
+DEFAULT_GRID = {
+    'track_types': [['Clean', 'Explicit'], ['Clean'], ['Explicit']],
+    'year_ranges': [None, [2015, None], [2020, None]],
+    'score_ranges': [None, [50, None], [100, None]],
+}
+
+# Changing any of these modules changes what a snapshot would contain
+RENDER_MODULES = [dataset, metrics, figures]
+
+_worker_df = None
+
+
+def code_hash():
+    digest = hashlib.sha256()
+    for path in [module.__file__ for module in RENDER_MODULES] + [__file__]:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    digest.update(plotly.__version__.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def resolve_range(bounds, column_min, column_max, cast):
+    lo, hi = bounds if bounds else (None, None)
+    return (cast(column_min if lo is None else lo), cast(column_max if hi is None else hi))
+
+
+def expand_grid(grid, df):
+    """All filter combinations of ``grid``, with full-range defaults filled in from ``df``."""
+    year_min, year_max = df['Release Year'].min(), df['Release Year'].max()
+    score_min, score_max = df['Track Score'].min(), df['Track Score'].max()
+
+    cells = []
+    for track_types in grid['track_types']:
+        for year_bounds in grid['year_ranges']:
+            for score_bounds in grid['score_ranges']:
+                year_range = resolve_range(year_bounds, year_min, year_max, int)
+                score_range = resolve_range(score_bounds, score_min, score_max, float)
+                cell_id = (f"{'-'.join(sorted(t.lower() for t in track_types)) or 'all'}"
+                           f"_{year_range[0]}-{year_range[1]}_{score_range[0]:g}-{score_range[1]:g}")
+                cells.append({
+                    'id': cell_id,
+                    'track_types': sorted(track_types),
+                    'year_range': list(year_range),
+                    'score_range': list(score_range),
+                })
+    return cells
+
+
+def cell_mask(df, cell):
+    return build_filter_mask(df, cell['track_types'], cell['year_range'], cell['score_range'])
+
+
+def cell_fingerprint(df, cell, render_hash):
+    digest = hashlib.sha256(render_hash.encode('utf-8'))
+    digest.update(json.dumps(cell, sort_keys=True).encode('utf-8'))
+    digest.update(data_fingerprint(df[cell_mask(df, cell)]).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _json_value(value):
+    """Plain JSON value of a number, with NaN as null."""
+    if value is None or isinstance(value, str):
+        return value
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+def _init_worker(data_path):
+    global _worker_df
+    _worker_df = load_dataset(data_path)
+
+
+def render_cell(cell, out_dir):
+    """Compute one grid cell and write its HTML page and JSON bundle; returns its track count."""
+    df = _worker_df
+    mask = cell_mask(df, cell)
+    df_filtered = df[mask]
+    summary = exact_summary(df, mask)
+
+    top15_q1 = top_ranked(df_filtered, ['Spotify Streams', 'YouTube Views', 'TikTok Views'],
+                          fill_columns=['YouTube Views', 'TikTok Views'])
+    top15_q3 = top_ranked(df_filtered, ['Spotify Streams', 'Spotify Playlist Count'],
+                          fill_columns=['Spotify Playlist Count', 'Spotify Streams'])
+    platform_totals = platform_totals_frame(summary)
+    platform_comparison = explicit_comparison_frame(summary)
+
+    # Same figures and empty-data rules as the dashboard sections
+    figs = {
+        'fig1_rank_trends': rank_trends_figure(top15_q1) if len(top15_q1) else None,
+        'fig5_platform_share': (platform_share_figure(platform_totals)
+                                if platform_totals['Total Engagement'].sum() > 0 else None),
+        'fig6_playlist_influence': playlist_influence_figure(top15_q3) if len(top15_q3) else None,
+        'fig9_explicit_comparison': (explicit_comparison_figure(platform_comparison)
+                                     if len(platform_comparison) else None),
+    }
+
+    key_metrics = {
+        'total_songs': summary['total_songs'],
+        'avg_streams': _json_value(summary['avg_streams'].value),
+        'explicit_pct': _json_value(summary['explicit_pct'].value),
+        'avg_score': _json_value(summary['avg_score'].value),
+        'top_artist': summary['top_artist'],
+    }
+    bundle = {
+        'id': cell['id'],
+        'filters': {key: cell[key] for key in ('track_types', 'year_range', 'score_range')},
+        'metrics': key_metrics,
+        'platform_totals': {p: _json_value(e.value) for p, e in summary['platform_totals'].items()},
+        'platform_shares': {p: _json_value(e.value) for p, e in summary['platform_shares'].items()},
+        'explicit_means': {t: {c: _json_value(e.value) for c, e in means.items()}
+                           for t, means in summary['explicit_means'].items()},
+        'top15_rank_trends': json.loads(top15_q1.to_json(orient='records')),
+        'top15_playlist_influence': json.loads(top15_q3.to_json(orient='records')),
+        'figures': {name: json.loads(pio.to_json(fig, validate=False)) if fig is not None else None
+                    for name, fig in figs.items()},
+    }
+
+    with open(os.path.join(out_dir, f"{cell['id']}.json"), 'w') as f:
+        json.dump(bundle, f, separators=(',', ':'))
+    with open(os.path.join(out_dir, f"{cell['id']}.html"), 'w', encoding='utf-8') as f:
+        f.write(snapshot_page(cell, key_metrics, figs, top15_q1, top15_q3))
+    return summary['total_songs']
+
+
+PAGE_STYLE = """
+body { background: #000; color: #fff; font-family: sans-serif; margin: 0 2rem 2rem; }
+h1 { color: #1DB954; } h2 { border-bottom: 3px solid #1DB954; padding-bottom: 0.5rem; margin-top: 2rem; }
+a { color: #1DB954; }
+.metrics { display: flex; gap: 1rem; flex-wrap: wrap; }
+.metric { background: #1a1a1a; border-radius: 10px; padding: 15px; min-width: 10rem; }
+.metric b { display: block; color: #1DB954; font-size: 1.5rem; }
+.figure { background: #fff; } table { border-collapse: collapse; background: #fff; color: #000; }
+td, th { padding: 0.25rem 0.75rem; border: 1px solid #ddd; text-align: left; }
+"""
+
+
+def _reference_table(top15):
+    reference = top15[['All Time Rank', 'Track']].astype({'All Time Rank': int})
+    reference.columns = ['Rank', 'Song']
+    return reference.to_html(index=False, border=0)
+
+
+def snapshot_page(cell, key_metrics, figs, top15_q1, top15_q3):
+    """Standalone HTML page of one grid cell; plotly.js is shared from the output directory."""
+    def metric(label, value):
+        return f'<div class="metric">{html.escape(label)}<b>{html.escape(value)}</b></div>'
+
+    def figure(name, title, table=None):
+        section = f'<h2>{html.escape(title)}</h2>'
+        if figs[name] is None:
+            return section + '<p>No data available for this visualization after filtering.</p>'
+        section += f'<div class="figure">{pio.to_html(figs[name], full_html=False, include_plotlyjs=False, div_id=name)}</div>'
+        if table is not None:
+            section += '<p><b>Song Reference:</b></p>' + _reference_table(table)
+        return section
+
+    def fmt(value, spec, scale=1):
+        return format(value / scale, spec) if value is not None else 'N/A'
+
+    filters = (f"Track Type: {', '.join(cell['track_types'])} &middot; "
+               f"Release Year: {cell['year_range'][0]}-{cell['year_range'][1]} &middot; "
+               f"Track Score: {cell['score_range'][0]:g}-{cell['score_range'][1]:g}")
+
+    if key_metrics['total_songs'] == 0:
+        body = '<p>No tracks match these filters.</p>'
+    else:
+        body = '<h2>Key Metrics</h2><div class="metrics">' + ''.join([
+            metric('Total Songs', f"{key_metrics['total_songs']:,}"),
+            metric('Avg Streams', f"{fmt(key_metrics['avg_streams'], '.1f', scale=1e6)}M"),
+            metric('% Explicit', f"{fmt(key_metrics['explicit_pct'], '.1f')}%"),
+            metric('Avg Score', fmt(key_metrics['avg_score'], '.1f')),
+            metric('Top Artist', (key_metrics['top_artist'] or 'N/A')[:15]),
+        ]) + '</div>' + ''.join([
+            figure('fig1_rank_trends', '1. Does YouTube and TikTok Popularity Predict Spotify Success?', top15_q1),
+            figure('fig5_platform_share', '2. Which Streaming Platform Drives the Most Engagement?'),
+            figure('fig6_playlist_influence', '3. Does Spotify Playlist Count Influence Spotify Streams?', top15_q3),
+            figure('fig9_explicit_comparison', '4. Do Explicit Songs Perform Better or Worse Across Platforms?'),
+        ])
+
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8">'
+            f'<title>Spotify Streaming Analytics - {html.escape(cell["id"])}</title>'
+            f'<script src="{PLOTLY_JS_NAME}"></script><style>{PAGE_STYLE}</style></head><body>'
+            f'<h1>Spotify Streaming Analytics Dashboard</h1><p>{filters} &middot; '
+            f'<a href="index.html">all snapshots</a> &middot; <a href="{html.escape(cell["id"])}.json">JSON</a></p>'
+            f'{body}</body></html>')
+
+
+def index_page(cells, manifest):
+    rows = ''.join(
+        f'<tr><td><a href="{html.escape(c["id"])}.html">{html.escape(c["id"])}</a></td>'
+        f'<td>{", ".join(c["track_types"])}</td><td>{c["year_range"][0]}-{c["year_range"][1]}</td>'
+        f'<td>{c["score_range"][0]:g}-{c["score_range"][1]:g}</td>'
+        f'<td>{manifest["cells"][c["id"]]["total_songs"]:,}</td></tr>'
+        for c in cells
+    )
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>Dashboard Snapshots</title>'
+            f'<style>{PAGE_STYLE}</style></head><body><h1>Dashboard Snapshots</h1><table>'
+            f'<tr><th>Snapshot</th><th>Track Type</th><th>Release Year</th><th>Track Score</th><th>Tracks</th></tr>'
+            f'{rows}</table></body></html>')
+
+
+def read_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'cells': {}}
+
+
+def is_current(out_dir, cell, fingerprint, manifest):
+    entry = manifest['cells'].get(cell['id'])
+    return (entry is not None and entry['fingerprint'] == fingerprint and
+            all(os.path.exists(os.path.join(out_dir, f"{cell['id']}.{ext}")) for ext in ('html', 'json')))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prerender static dashboard snapshots for a grid of filters.")
+    parser.add_argument('--grid', metavar='JSON',
+                        help="Grid file with 'track_types', 'year_ranges' and 'score_ranges' lists "
+                             "(default: a built-in 3 x 3 x 3 grid)")
+    parser.add_argument('--data', default=DATA_PATH, help=f"Cleaned dataset (default: {DATA_PATH})")
+    parser.add_argument('--out', default=OUTPUT_DIR, help=f"Output directory (default: {OUTPUT_DIR})")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="Render processes (default: one per CPU)")
+    parser.add_argument('--force', action='store_true', help="Re-render cells even when unchanged")
+    parser.add_argument('--list', action='store_true', help="List the grid cells and exit")
+    args = parser.parse_args(argv)
+
+    grid = DEFAULT_GRID
+    if args.grid:
+        with open(args.grid) as f:
+            grid = {**DEFAULT_GRID, **json.load(f)}
+
+    df = load_dataset(args.data)
+    cells = expand_grid(grid, df)
+    if args.list:
+        for cell in cells:
+            print(f"{cell['id']:<40} tracks: {int(cell_mask(df, cell).sum()):,}")
+        return
+
+    print("="*70)
+    print("DASHBOARD SNAPSHOTS")
+    print("="*70)
+
+    os.makedirs(args.out, exist_ok=True)
+    manifest = read_manifest(args.out)
+    render_hash = code_hash()
+    fingerprints = {cell['id']: cell_fingerprint(df, cell, render_hash) for cell in cells}
+    stale = [cell for cell in cells
+             if args.force or not is_current(args.out, cell, fingerprints[cell['id']], manifest)]
+
+    if stale:
+        with ProcessPoolExecutor(max_workers=min(args.workers, len(stale)),
+                                 initializer=_init_worker, initargs=(args.data,)) as pool:
+            counts = pool.map(render_cell, stale, [args.out] * len(stale))
+            for cell, total_songs in zip(stale, counts):
+                manifest['cells'][cell['id']] = {
+                    'fingerprint': fingerprints[cell['id']],
+                    'filters': {key: cell[key] for key in ('track_types', 'year_range', 'score_range')},
+                    'total_songs': total_songs,
+                }
+                print(f"{cell['id']}: rendered ({total_songs:,} tracks)")
+    unchanged = len(cells) - len(stale)
+    if unchanged:
+        print(f"{unchanged} of {len(cells)} cells unchanged, using existing snapshots")
+
+    # Drop snapshots of cells that left the grid
+    grid_ids = {cell['id'] for cell in cells}
+    for cell_id in sorted(set(manifest['cells']) - grid_ids):
+        for ext in ('html', 'json'):
+            path = os.path.join(args.out, f'{cell_id}.{ext}')
+            if os.path.exists(path):
+                os.remove(path)
+        del manifest['cells'][cell_id]
+        print(f"{cell_id}: removed (no longer in the grid)")
+
+    plotly_js = os.path.join(args.out, PLOTLY_JS_NAME)
+    if manifest.get('plotly_version') != plotly.__version__ or not os.path.exists(plotly_js):
+        with open(plotly_js, 'w', encoding='utf-8') as f:
+            f.write(get_plotlyjs())
+        manifest['plotly_version'] = plotly.__version__
+
+    with open(os.path.join(args.out, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(index_page(cells, manifest))
+    with open(os.path.join(args.out, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"\nSnapshots written to '{args.out}/' (open index.html)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+import gzip
+import io
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+import data_export
+from data_export import EXPORT_FORMATS, remove_expired_exports, write_export
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        'Track': [f'Track {i}' for i in range(10)],
+        'Spotify Streams': np.arange(10) * 1_000.0,
+    })
+
+
+@pytest.mark.parametrize('export_format', list(EXPORT_FORMATS))
+def test_write_export_round_trips(frame, export_format, tmp_path):
+    mask = np.arange(len(frame)) % 2 == 0
+    name = write_export(frame, export_format, mask=mask, columns=['Track'], max_rows=3, export_dir=tmp_path)
+    assert name.endswith('.' + EXPORT_FORMATS[export_format][0])
+    data = (tmp_path / name).read_bytes()
+
+    if export_format == 'CSV':
+        exported = pd.read_csv(io.BytesIO(data))
+    elif export_format == 'CSV (gzip)':
+        exported = pd.read_csv(io.BytesIO(gzip.decompress(data)))
+    else:
+        exported = pq.read_table(io.BytesIO(data)).to_pandas()
+
+    assert list(exported.columns) == ['Track']
+    assert list(exported['Track']) == ['Track 0', 'Track 2', 'Track 4']
+
+
+def test_failed_export_leaves_no_file(frame, tmp_path, monkeypatch):
+    def failing(*args, **kwargs):
+        yield b'Track\n'
+        raise RuntimeError('boom')
+
+    monkeypatch.setitem(data_export.EXPORTERS, 'CSV', failing)
+    with pytest.raises(RuntimeError):
+        write_export(frame, 'CSV', export_dir=tmp_path)
+    assert os.listdir(tmp_path) == []
+
+
+def test_remove_expired_exports(frame, tmp_path):
+    old = write_export(frame, 'CSV', export_dir=tmp_path)
+    new = write_export(frame, 'CSV', export_dir=tmp_path)
+    an_hour_ago = time.time() - 3600
+    os.utime(tmp_path / old, (an_hour_ago, an_hour_ago))
+
+    assert remove_expired_exports(tmp_path, max_age=60) == 1
+    assert os.listdir(tmp_path) == [new]
+    assert remove_expired_exports(tmp_path / 'missing') == 0
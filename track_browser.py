@@ -0,0 +1,96 @@
+"""Server-side sorting and paging for the track browser.
+
+Each metric column is argsorted once over the full dataset. A filter
+state only selects from those precomputed orders, so sorting never
+reruns per filter change and only the visible page leaves the server.
+Filtered orders are cached by a hash of the filter mask, within a byte
+budget, so slider positions that select the same rows share one entry
+and orders for filter states nobody pages through anymore are evicted.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Bytes of filtered orders kept across all sessions
+ORDER_CACHE_BYTES = 64 * 1024**2
+
+
+class SortIndex:
+    """Precomputed sort orders for the numeric columns of a frame."""
+
+    def __init__(self, df, columns):
+        # Positions fit in int32 for any realistic catalog, halving every stored order
+        position_dtype = np.int32 if len(df) < 2**31 else np.int64
+        self._ascending = {}
+        for col in columns:
+            values = df[col].to_numpy(dtype=float)
+            # NaNs sort last, so the order splits into valid rows then missing
+            self._ascending[col] = np.argsort(values, kind='stable').astype(position_dtype)
+        self._missing = {col: df[col].isna().to_numpy() for col in columns}
+        self._num_rows = len(df)
+        self._cache = OrderedDict()
+        self._cache_bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def columns(self):
+        return list(self._ascending)
+
+    def _filtered_order(self, column, descending, mask):
+        mask_digest = hashlib.blake2b(np.packbits(mask)).digest() if mask is not None else None
+        key = (column, descending, mask_digest)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        order = self._ascending[column]
+        if mask is not None:
+            order = order[mask[order]]
+        if descending:
+            # Reverse the valid rows but keep missing values at the end
+            num_valid = len(order) - int(self._missing[column][order].sum())
+            order = np.concatenate([order[:num_valid][::-1], order[num_valid:]])
+
+        if mask is not None or descending:
+            with self._lock:
+                if key not in self._cache and order.nbytes <= ORDER_CACHE_BYTES:
+                    self._cache[key] = order
+                    self._cache_bytes += order.nbytes
+                    while self._cache_bytes > ORDER_CACHE_BYTES:
+                        _, evicted = self._cache.popitem(last=False)
+                        self._cache_bytes -= evicted.nbytes
+        return order
+
+    def page(self, column, page, page_size, descending=False, mask=None):
+        """Return the row positions on ``page`` (0-based) and the total row count.
+
+        The filtered order is cached by a hash of ``mask``, so paging
+        through it is a slice.
+        """
+        order = self._filtered_order(column, descending, mask)
+        start = page * page_size
+        return order[start:start + page_size], len(order)
+
+    def first(self, column, n, mask=None):
+        """Return the positions of the first ``n`` rows in ascending ``column`` order that pass ``mask``.
+
+        The precomputed order is scanned in growing chunks and the scan
+        stops once ``n`` rows are found, so nothing is sorted and a short
+        list rarely touches every row.
+        """
+        order = self._ascending[column]
+        if mask is None:
+            return order[:n]
+
+        found, num_found = [], 0
+        start, chunk = 0, max(4 * n, 1024)
+        while start < len(order) and num_found < n:
+            block = order[start:start + chunk]
+            found.append(block[mask[block]])
+            num_found += len(found[-1])
+            start += chunk
+            chunk *= 2
+        return np.concatenate(found)[:n] if found else order[:0]